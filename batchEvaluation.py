@@ -0,0 +1,78 @@
+'''
+Batched move counting with NumPy. The leaves below one frontier node of the search are stacked into arrays of
+shape (N, boardSize, boardSize), and the mobility and multi-jump counts of every leaf are found at once with
+array slices and masks instead of one leaf at a time.
+
+NumPy is optional. Without it NUMPY_AVAILABLE is False and the search evaluates leaves one at a time.
+'''
+
+try:
+    import numpy
+    NUMPY_AVAILABLE = True
+except ImportError:
+    numpy = None
+    NUMPY_AVAILABLE = False
+
+
+'''
+This function unpacks bitboards into boolean arrays.
+Accepts a list of N bitboards and the board size. Returns an array of shape (N, boardSize, boardSize), where
+[n, row, col] is bit row*boardSize + col of bitboard n.
+'''
+def boardsToArrays(boards, boardSize):
+    numOfSquares = boardSize * boardSize
+    numOfBytes = (numOfSquares + 7) // 8
+    packedBoards = numpy.frombuffer(b''.join(board.to_bytes(numOfBytes, 'little') for board in boards), dtype=numpy.uint8)
+    squares = numpy.unpackbits(packedBoards.reshape(len(boards), numOfBytes), axis=1, bitorder='little')
+    return squares[:, :numOfSquares].reshape(len(boards), boardSize, boardSize).astype(bool)
+
+
+'''
+This function counts the moves of one color on a stack of boards.
+Accepts arrays of shape (N, boardSize, boardSize) of the color's pieces, the opponent's pieces and the empty
+squares. Returns two arrays of N counts: the number of legal moves, and the number of jumps beyond the first
+over all legal moves, the same as GameState.mobility and GameState.multiJumps.
+'''
+def countMoves(curPieces, opponentPieces, emptySquares):
+    numOfBoards, boardSize = curPieces.shape[0], curPieces.shape[2]
+    mobility = numpy.zeros(numOfBoards, dtype=numpy.int64)
+    multiJumps = numpy.zeros(numOfBoards, dtype=numpy.int64)
+
+    # Each direction is turned into a jump toward higher column indices: as is (right), mirrored (left),
+    # transposed (down) and transposed and mirrored (up)
+    directions = ((curPieces, opponentPieces, emptySquares),
+                  (curPieces[:, :, ::-1], opponentPieces[:, :, ::-1], emptySquares[:, :, ::-1]))
+    transposed = tuple(squares.transpose(0, 2, 1) for squares in (curPieces, opponentPieces, emptySquares))
+    directions = directions + (transposed, tuple(squares[:, :, ::-1] for squares in transposed))
+
+    for cur, opponent, empty in directions:
+        # chain[n, row, col] is set when the piece at <row, col> can jump this many times along the row
+        chain = cur[:, :, :boardSize-2] & opponent[:, :, 1:boardSize-1] & empty[:, :, 2:]
+        jumps = 1
+        while (True):
+            counts = chain.sum(axis=(1, 2))
+            mobility = mobility + counts
+            multiJumps = multiJumps + (jumps-1)*counts
+            jumps = jumps + 1
+            width = boardSize - 2*jumps
+            if (width <= 0 or not counts.any()):
+                break
+            chain = chain[:, :, :width] & opponent[:, :, 2*jumps-1:boardSize-1] & empty[:, :, 2*jumps:]
+    return mobility, multiJumps
+
+
+'''
+This function counts the moves of both colors on a batch of positions.
+Accepts the lists of dark and light bitboards of the positions and the board size.
+Returns dicts keyed by color of the mobility and multi-jump count arrays.
+'''
+def countMovesBatch(darkBoards, lightBoards, boardSize):
+    # Dark's moves and light's moves are counted in one pass over a stack of 2N boards: the first N hold dark to
+    # move, and the last N light to move
+    numOfBoards = len(darkBoards)
+    curPieces = boardsToArrays(darkBoards + lightBoards, boardSize)
+    opponentPieces = numpy.concatenate((curPieces[numOfBoards:], curPieces[:numOfBoards]))
+    emptySquares = ~(curPieces | opponentPieces)
+    mobility, multiJumps = countMoves(curPieces, opponentPieces, emptySquares)
+    return ({'X': mobility[:numOfBoards], 'O': mobility[numOfBoards:]},
+            {'X': multiJumps[:numOfBoards], 'O': multiJumps[numOfBoards:]})
@@ -0,0 +1,516 @@
+'''
+Benchmarks for the search. Run this file to time move generation, move application, leaf evaluation and the
+MiniMax searches over a fixed corpus of opening, midgame and endgame positions (benchmarkPositions.json).
+The results are printed and written as JSON, so runs from different commits can be compared.
+
+Example:
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+    python benchmark.py --build-corpus --board-size 16 --corpus positions16.json
+    python benchmark.py --corpus positions16.json --output board16.json
+'''
+
+from game import Game, MAX_SCORE
+from gameState import GameState, BOARD_SIZE, getOpeningRemovals
+from batchEvaluation import NUMPY_AVAILABLE
+from monteCarlo import MonteCarloTreeSearch
+from match import playMatch
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarkPositions.json')
+PHASES = ('opening', 'midgame', 'endgame')
+MINIMAX_DEPTHS = (2, 3, 4)
+ALPHA_BETA_DEPTHS = (2, 4, 6)
+
+
+'''
+This function plays random games from the standard opening and collects the positions reached after each move.
+Accepts the number of games and a random seed. Returns a list of (gameState, last action, color to move) tuples.
+'''
+def randomGamePositions(numOfGames, seed = 0):
+    rng = random.Random(seed)
+    positions = []
+    for gameNumber in range(numOfGames):
+        gameState = GameState()
+        darkRemoval, lightRemoval = getOpeningRemovals()
+        gameState.applyAction(darkRemoval, 'X', 'O')
+        gameState.applyAction(lightRemoval, 'O', 'X')
+        curColor, opponentColor = 'X', 'O'
+        while (True):
+            allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+            if (len(allLegalActions) == 0):
+                break
+            action = rng.choice(allLegalActions)
+            gameState.makeMove(action, curColor, opponentColor)
+            curColor, opponentColor = opponentColor, curColor
+            positions.append((GameState(gameState), action, curColor))
+    return positions
+
+
+'''
+This function times a leaf evaluation function over a list of positions.
+Returns the average time per leaf in microseconds.
+'''
+def timeEvaluation(evaluate, positions, repeats):
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        for gameState, action, curColor in positions:
+            evaluate(gameState, action)
+    return (time.perf_counter() - start) / (repeats * len(positions)) * 1e6
+
+
+'''
+This function compares the incremental leaf evaluation with the original one that generates both players' moves.
+It also times makeMove/unmakeMove, which now carry the cost of keeping the move counts up to date.
+'''
+def benchmarkEvaluation(numOfGames = 50, repeats = 5):
+    positions = randomGamePositions(numOfGames)
+    game = Game('O', 'X', 3, 6)
+
+    for gameState, action, curColor in positions:
+        if (game.evaluation(gameState, action) != game.evaluationFromLegalActions(gameState, action)):
+            raise AssertionError('evaluation differs from evaluationFromLegalActions')
+
+    fullTime = timeEvaluation(game.evaluationFromLegalActions, positions, repeats)
+    incrementalTime = timeEvaluation(game.evaluation, positions, repeats)
+    print('Leaf evaluation over', len(positions), 'positions')
+    print('  move generation: %8.2f us/leaf' % fullTime)
+    print('  incremental:     %8.2f us/leaf  (%.1fx faster)' % (incrementalTime, fullTime / incrementalTime))
+
+    moves = 0
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        for gameState, action, curColor in positions:
+            opponentColor = 'O' if curColor == 'X' else 'X'
+            for action in gameState.getLegalActions(curColor, opponentColor):
+                gameState.unmakeMove(gameState.makeMove(action, curColor, opponentColor))
+                moves = moves + 1
+    print('  makeMove + unmakeMove: %.2f us/move' % ((time.perf_counter() - start) / moves * 1e6))
+
+
+'''
+This function compares the leaves per second of scalar and batched (NumPy) evaluation.
+At each frontier position the scalar path makes every move, evaluates the leaf and unmakes the move, as the
+search does, and the batched path evaluates all the children at once. Alpha beta searches of the corpus are then
+timed both ways, and must pick the same moves.
+'''
+def benchmarkBatchEvaluation(positions, numOfGames = 50, repeats = 5, depths = (4, 6)):
+    if (not NUMPY_AVAILABLE):
+        print('Batched evaluation needs NumPy, which is not installed')
+        return
+    frontier = [(gameState, curColor) for gameState, action, curColor in randomGamePositions(numOfGames)
+                if (gameState.mobility[curColor] > 0)]
+    game = Game('O', 'X', 3, 6)
+
+    for gameState, curColor in frontier:
+        opponentColor = otherColor(curColor)
+        allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+        scalarScores = []
+        for action in allLegalActions:
+            undoRecord = gameState.makeMove(action, curColor, opponentColor)
+            scalarScores.append(game.evaluation(gameState, action))
+            gameState.unmakeMove(undoRecord)
+        if (game.evaluateFrontier(gameState, curColor, opponentColor, allLegalActions) != scalarScores):
+            raise AssertionError('evaluationBatch differs from evaluation')
+
+    leaves = 0
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        for gameState, curColor in frontier:
+            opponentColor = otherColor(curColor)
+            for action in gameState.getLegalActions(curColor, opponentColor):
+                undoRecord = gameState.makeMove(action, curColor, opponentColor)
+                game.evaluation(gameState, action)
+                gameState.unmakeMove(undoRecord)
+                leaves = leaves + 1
+    scalarRate = leaves / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        for gameState, curColor in frontier:
+            opponentColor = otherColor(curColor)
+            game.evaluateFrontier(gameState, curColor, opponentColor, gameState.getLegalActions(curColor, opponentColor))
+    batchRate = leaves / (time.perf_counter() - start)
+    print('Frontier evaluation over', len(frontier), 'positions,', leaves // repeats, 'leaves')
+    print('  scalar:  %10.0f leaves/s' % scalarRate)
+    print('  batched: %10.0f leaves/s  (%.2fx)' % (batchRate, batchRate / scalarRate))
+
+    for depth in depths:
+        rates = []
+        for batchEvaluation in (False, True):
+            evaluations = 0
+            actions = []
+            start = time.perf_counter()
+            for position in positions:
+                game = Game(otherColor(position['toMove']), position['toMove'], 3, depth, batchEvaluation = batchEvaluation)
+                gameState = position['gameState']
+                actions.append(game.selectAction(gameState, gameState.getLegalActions(game.botColor, game.playerColor)))
+                evaluations = evaluations + game.getSearchStats()['evaluations']
+            rates.append((evaluations / (time.perf_counter() - start), actions))
+        if (rates[0][1] != rates[1][1]):
+            raise AssertionError('batched search picked different moves at depth ' + str(depth))
+        print('  alpha beta depth %d: scalar %8.0f leaves/s, batched %8.0f leaves/s' % (depth, rates[0][0], rates[1][0]))
+
+
+'''
+This function reports the time to move of parallel root search with different numbers of workers.
+One worker is the serial search. Each worker count searches the same positions to the same depth, and the
+chosen moves are checked against the serial search. The pool is started before timing, so startup is not counted.
+'''
+def benchmarkParallelRoot(workerCounts = (1, 2, 4, 8, 16), depth = 6, numOfPositions = 4):
+    allPositions = randomGamePositions(4, seed = 1)
+    positions = allPositions[4:len(allPositions):max(1, len(allPositions) // numOfPositions)][:numOfPositions]
+    print('Parallel root search, depth', depth, 'over', len(positions), 'positions,', os.cpu_count(), 'cpus')
+
+    serialMoves = None
+    serialTime = None
+    for numOfWorkers in workerCounts:
+        moves = []
+        totalTime = 0.0
+        for gameState, action, curColor in positions:
+            opponentColor = 'O' if curColor == 'X' else 'X'
+            game = Game(opponentColor, curColor, 3, depth, numWorkers = numOfWorkers)
+            if (numOfWorkers > 1):
+                game.getRootPool().submit(time.sleep, 0).result()
+            allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+            start = time.perf_counter()
+            moves.append(game.selectMiniMaxAB(GameState(gameState), allLegalActions, -MAX_SCORE, MAX_SCORE))
+            totalTime = totalTime + time.perf_counter() - start
+            game.closeWorkers()
+
+        averageTime = totalTime / len(positions)
+        if (serialMoves is None):
+            serialMoves = moves
+            serialTime = averageTime
+        sameMoves = 'same moves' if (moves == serialMoves) else 'DIFFERENT MOVES'
+        print('  %2d workers: %8.3f s/move  speedup %5.2fx  %s' % (numOfWorkers, averageTime, serialTime / averageTime, sameMoves))
+
+
+'''
+This function reports the random games per second of Monte Carlo tree search on the corpus, and its win rate
+against alpha beta search at several depths and at the same time budget per move. Each pairing plays numOfGames
+games from random openings, with the colors swapped every other game.
+'''
+def benchmarkMonteCarlo(positions, iterations = 1000, depths = (2, 4), timeBudget = 500, numOfGames = 4):
+    playouts = 0
+    start = time.perf_counter()
+    for position in positions:
+        search = MonteCarloTreeSearch(position['toMove'], otherColor(position['toMove']), position['gameState'].boardSize, seed = 0)
+        gameState = position['gameState']
+        search.selectAction(gameState, gameState.getLegalActions(search.botColor, search.playerColor), iterations)
+        playouts = playouts + search.playouts
+    print('Monte Carlo tree search over', len(positions), 'positions: %.0f random games/s' % (playouts / (time.perf_counter() - start)))
+
+    opponents = [('alpha beta depth %d' % depth, {'algo': 5, 'depth': iterations}, {'algo': 3, 'depth': depth})
+                 for depth in depths]
+    opponents.append(('alpha beta, %d ms each' % timeBudget, {'algo': 5, 'depth': 1, 'timeBudget': timeBudget},
+                      {'algo': 3, 'depth': 1, 'timeBudget': timeBudget}))
+    for name, monteCarloPlayer, alphaBetaPlayer in opponents:
+        wins = 0
+        for gameNumber in range(numOfGames):
+            monteCarloColor = 'X' if (gameNumber % 2 == 0) else 'O'
+            if (monteCarloColor == 'X'):
+                result = playMatch(monteCarloPlayer, alphaBetaPlayer, seed = gameNumber, openingPlies = 2)
+            else:
+                result = playMatch(alphaBetaPlayer, monteCarloPlayer, seed = gameNumber, openingPlies = 2)
+            if (result['winner'] == monteCarloColor):
+                wins = wins + 1
+        print('  vs %-24s won %d of %d games' % (name, wins, numOfGames))
+
+
+'''
+This function builds the position corpus by playing random games and saving one opening, one midgame and one
+endgame position from each. The opening is taken a few plies in, the midgame halfway through the game and the
+endgame a few plies before its end, so that every saved position still has legal moves.
+Returns the corpus as a list of dicts, in the format written to benchmarkPositions.json.
+'''
+def buildPositionCorpus(numOfGames = 4, seed = 2024, boardSize = BOARD_SIZE):
+    rng = random.Random(seed)
+    corpus = []
+    for gameNumber in range(numOfGames):
+        gameState = GameState(boardSize = boardSize)
+        darkRemoval, lightRemoval = getOpeningRemovals(boardSize)
+        gameState.applyAction(darkRemoval, 'X', 'O')
+        gameState.applyAction(lightRemoval, 'O', 'X')
+        curColor, opponentColor = 'X', 'O'
+        history = []
+        while (True):
+            allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+            if (len(allLegalActions) == 0):
+                break
+            action = rng.choice(allLegalActions)
+            gameState.makeMove(action, curColor, opponentColor)
+            curColor, opponentColor = opponentColor, curColor
+            history.append((gameState.getBoard(), action, curColor))
+
+        plies = {'opening': min(3, len(history) - 1), 'midgame': len(history) // 2, 'endgame': max(0, len(history) - 5)}
+        for phase in PHASES:
+            board, action, curColor = history[plies[phase]]
+            corpus.append({'name': phase + '-' + str(gameNumber), 'phase': phase, 'toMove': curColor,
+                           'lastMove': action, 'board': [''.join(row) for row in board]})
+    return corpus
+
+
+'''
+This function writes the position corpus to a JSON file, one position per line.
+'''
+def savePositionCorpus(corpus, path = CORPUS_PATH):
+    with open(path, 'w') as corpusFile:
+        corpusFile.write('[\n' + ',\n'.join(json.dumps(position) for position in corpus) + '\n]\n')
+
+
+'''
+This function loads the position corpus.
+Returns a list of dicts with the name, phase, color to move, last move and GameState of each position.
+'''
+def loadPositionCorpus(path = CORPUS_PATH):
+    with open(path) as corpusFile:
+        corpus = json.load(corpusFile)
+    positions = []
+    for position in corpus:
+        gameState = GameState(boardSize = len(position['board']))
+        gameState.setBoard(position['board'])
+        positions.append({'name': position['name'], 'phase': position['phase'], 'toMove': position['toMove'],
+                          'lastMove': position['lastMove'], 'gameState': gameState})
+    return positions
+
+
+'''
+This function returns the opponent of the given color.
+'''
+def otherColor(color):
+    return 'O' if (color == 'X') else 'X'
+
+
+'''
+This function times getLegalActions for the side to move, repeated over each position.
+Returns the number of calls, the number of moves generated and the time spent.
+'''
+def runMoveGeneration(positions, repeats):
+    calls = 0
+    moves = 0
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        for position in positions:
+            curColor = position['toMove']
+            moves = moves + len(position['gameState'].getLegalActions(curColor, otherColor(curColor)))
+            calls = calls + 1
+    return {'calls': calls, 'moves': moves, 'seconds': time.perf_counter() - start}
+
+
+'''
+This function times applyAction of every legal move of each position, each applied to a fresh copy of the position.
+The copy is part of the cost, since that is how the game applies a move it has chosen.
+Returns the number of calls and the time spent.
+'''
+def runApplyAction(positions, repeats):
+    work = []
+    for position in positions:
+        curColor = position['toMove']
+        for action in position['gameState'].getLegalActions(curColor, otherColor(curColor)):
+            work.append((position['gameState'], action, curColor, otherColor(curColor)))
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        for gameState, action, curColor, opponentColor in work:
+            GameState(gameState).applyAction(action, curColor, opponentColor)
+    return {'calls': repeats * len(work), 'seconds': time.perf_counter() - start}
+
+
+'''
+This function times the leaf evaluation of each position, scored for the side that made the last move.
+Returns the number of evaluations and the time spent.
+'''
+def runEvaluation(positions, repeats):
+    boardSize = positions[0]['gameState'].boardSize
+    games = {color: Game(otherColor(color), color, 3, 1, tableSize = 1, boardSize = boardSize) for color in ('X', 'O')}
+    work = []
+    for position in positions:
+        work.append((games[otherColor(position['toMove'])], position['gameState'], position['lastMove']))
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        for game, gameState, lastMove in work:
+            game.evaluation(gameState, lastMove)
+    return {'calls': repeats * len(work), 'evaluations': repeats * len(work), 'seconds': time.perf_counter() - start}
+
+
+'''
+This function times one bot move of MiniMax (algo 2) or MiniMax with alpha-beta (algo 3) from each position,
+searched to a fixed depth by the side to move with a fresh Game, so that nothing carries over between positions.
+Returns the number of searches, the nodes and static evaluations counted by the search, and the time spent.
+'''
+def runSearch(positions, algo, depth):
+    calls = 0
+    nodes = 0
+    evaluations = 0
+    seconds = 0.0
+    for position in positions:
+        curColor = position['toMove']
+        game = Game(otherColor(curColor), curColor, algo, depth, boardSize = position['gameState'].boardSize)
+        gameState = GameState(position['gameState'])
+        allLegalActions = gameState.getLegalActions(curColor, otherColor(curColor))
+        start = time.perf_counter()
+        if (algo == 2):
+            game.selectMiniMax(gameState, allLegalActions)
+        else:
+            game.selectMiniMaxAB(gameState, allLegalActions, -MAX_SCORE, MAX_SCORE)
+        seconds = seconds + time.perf_counter() - start
+        stats = game.getSearchStats()
+        calls = calls + 1
+        nodes = nodes + stats['nodes']
+        evaluations = evaluations + stats['evaluations']
+    return {'calls': calls, 'nodes': nodes, 'evaluations': evaluations, 'seconds': seconds}
+
+
+'''
+This function returns the peak memory in KiB allocated while running a benchmark case.
+The case is run again under tracemalloc, which slows it down, so it is kept out of the timed run.
+'''
+def measurePeakMemory(runCase):
+    tracemalloc.start()
+    try:
+        runCase()
+        currentSize, peakSize = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peakSize / 1024
+
+
+'''
+This function returns the benchmark cases as (case name, depth, function running the case on a list of positions).
+Quick mode drops the deepest search of each algorithm.
+'''
+def getBenchmarkCases(repeats, quick = False):
+    minimaxDepths = MINIMAX_DEPTHS[:-1] if (quick) else MINIMAX_DEPTHS
+    alphaBetaDepths = ALPHA_BETA_DEPTHS[:-1] if (quick) else ALPHA_BETA_DEPTHS
+    cases = [('getLegalActions', None, lambda positions: runMoveGeneration(positions, repeats)),
+             ('applyAction', None, lambda positions: runApplyAction(positions, repeats)),
+             ('evaluation', None, lambda positions: runEvaluation(positions, repeats))]
+    for depth in minimaxDepths:
+        cases.append(('selectMiniMax', depth, lambda positions, depth = depth: runSearch(positions, 2, depth)))
+    for depth in alphaBetaDepths:
+        cases.append(('selectMiniMaxAB', depth, lambda positions, depth = depth: runSearch(positions, 3, depth)))
+    return cases
+
+
+'''
+This function runs every benchmark case on the positions of each phase of the corpus.
+Accepts the corpus positions, the number of repeats of the cheap cases, whether to skip the deepest searches,
+and whether to measure peak memory. Returns one result dict per case and phase.
+'''
+def runBenchmarks(positions, repeats = 200, quick = False, measureMemory = True):
+    results = []
+    for caseName, depth, runCase in getBenchmarkCases(repeats, quick):
+        for phase in PHASES:
+            phasePositions = [position for position in positions if (position['phase'] == phase)]
+            if (len(phasePositions) == 0):
+                continue
+            result = {'case': caseName, 'phase': phase, 'depth': depth, 'boardSize': phasePositions[0]['gameState'].boardSize,
+                      'positions': len(phasePositions)}
+            result.update(runCase(phasePositions))
+            seconds = result['seconds']
+            if ('nodes' in result):
+                result['nodesPerSecond'] = result['nodes'] / seconds if (seconds > 0) else None
+            if ('evaluations' in result):
+                result['evaluationsPerSecond'] = result['evaluations'] / seconds if (seconds > 0) else None
+            result['microsecondsPerCall'] = seconds / result['calls'] * 1e6
+            if (measureMemory):
+                result['peakMemoryKiB'] = measurePeakMemory(lambda: runCase(phasePositions))
+            results.append(result)
+            printResult(result)
+    return results
+
+
+'''
+This function prints one benchmark result as a line of the results table.
+'''
+def printResult(result):
+    label = result['case'] + ('' if (result['depth'] is None) else ' depth ' + str(result['depth']))
+    line = '%-24s %-8s %10.4f s %12.2f us/call' % (label, result['phase'], result['seconds'], result['microsecondsPerCall'])
+    if (result.get('nodesPerSecond') is not None):
+        line = line + ' %10d nodes %12.0f nodes/s' % (result['nodes'], result['nodesPerSecond'])
+    if (result.get('evaluationsPerSecond') is not None):
+        line = line + ' %12.0f evals/s' % result['evaluationsPerSecond']
+    if ('peakMemoryKiB' in result):
+        line = line + ' %10.1f KiB peak' % result['peakMemoryKiB']
+    print(line)
+
+
+'''
+This function returns the commit the benchmark ran on, or None outside of a git checkout.
+'''
+def getGitCommit():
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    commit = output.stdout.strip()
+    return commit if (output.returncode == 0 and commit != '') else None
+
+
+'''
+This function prints how each case of a new run compares with the same case of an older run.
+Times per call are compared as the ratio new/old, so values below 1 are faster. Node counts that changed are flagged,
+since a search that visits different nodes is doing different work, not the same work faster.
+'''
+def compareResults(oldReport, newReport):
+    oldResults = {(result['case'], result['phase'], result['depth']): result for result in oldReport['results']}
+    print('Compared with', oldReport.get('commit'), '(time per call ratio new/old, below 1 is faster)')
+    for result in newReport['results']:
+        oldResult = oldResults.get((result['case'], result['phase'], result['depth']))
+        if (oldResult is None or oldResult['microsecondsPerCall'] <= 0):
+            continue
+        label = result['case'] + ('' if (result['depth'] is None) else ' depth ' + str(result['depth']))
+        line = '%-24s %-8s %6.2fx' % (label, result['phase'], result['microsecondsPerCall'] / oldResult['microsecondsPerCall'])
+        if ('nodes' in result and result['nodes'] != oldResult.get('nodes')):
+            line = line + '  nodes %s -> %d' % (oldResult.get('nodes'), result['nodes'])
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark move generation, evaluation and search on fixed positions.')
+    parser.add_argument('--output', default='benchmark.json', help='JSON file the results are written to')
+    parser.add_argument('--compare', help='earlier JSON results to compare this run with')
+    parser.add_argument('--corpus', default=CORPUS_PATH, help='JSON file of positions to benchmark')
+    parser.add_argument('--repeats', type=int, default=200, help='repeats of the move generation and evaluation cases')
+    parser.add_argument('--quick', action='store_true', help='skip the deepest search of each algorithm')
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory measurements')
+    parser.add_argument('--build-corpus', action='store_true', help='rebuild the position corpus and exit')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE, help='board size of a rebuilt corpus, 6 to 16')
+    parser.add_argument('--evaluation', action='store_true', help='also compare incremental and full evaluation')
+    parser.add_argument('--parallel', action='store_true', help='also time parallel root search')
+    parser.add_argument('--batch', action='store_true', help='also compare scalar and batched NumPy evaluation')
+    parser.add_argument('--mcts', action='store_true', help='also time Monte Carlo tree search and play it against alpha beta')
+    args = parser.parse_args()
+
+    if (args.build_corpus):
+        savePositionCorpus(buildPositionCorpus(boardSize = args.board_size), args.corpus)
+        sys.exit(0)
+
+    results = runBenchmarks(loadPositionCorpus(args.corpus), args.repeats, args.quick, not args.no_memory)
+    report = {'commit': getGitCommit(), 'python': platform.python_version(), 'platform': platform.platform(),
+              'cpus': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'repeats': args.repeats,
+              'results': results}
+    with open(args.output, 'w') as outputFile:
+        json.dump(report, outputFile, indent=1)
+    print('Results written to', args.output)
+
+    if (args.compare is not None):
+        with open(args.compare) as compareFile:
+            compareResults(json.load(compareFile), report)
+    if (args.evaluation):
+        benchmarkEvaluation()
+    if (args.parallel):
+        benchmarkParallelRoot()
+    if (args.batch):
+        benchmarkBatchEvaluation(loadPositionCorpus(args.corpus))
+    if (args.mcts):
+        benchmarkMonteCarlo(loadPositionCorpus(args.corpus))
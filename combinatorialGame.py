@@ -0,0 +1,426 @@
+'''
+Combinatorial game decomposition. Late in a Konane game the pieces split into groups that can no longer reach
+each other, and the position is then a sum of independent games, one per region of the board. Each region gets a
+combinatorial game value, the value of the whole position is the sum of the region values, and the sign of that
+sum says who wins.
+
+Dark is Left and light is Right: a value G is written {left options | right options}, where the left options are
+the values dark can move to and the right options the values light can move to. The player left without a move
+loses, as in Konane. Values are kept in canonical form, and each canonical value is built only once, so equal
+values are the same object.
+'''
+
+from gameState import GameState
+
+# Region positions one bot move may value before it gives up, leaving the position to alpha beta search
+REGION_POSITION_BUDGET = 20000
+
+# Number of region values and comparisons kept before the caches are emptied
+MAX_REGION_VALUES = 2**16
+MAX_COMPARISONS = 2**20
+
+
+class GameValue:
+
+    '''
+    Constructor
+    Accepts the left and right options, as tuples of canonical GameValues. Canonical values are made by makeGame,
+    which also gives them an index; values with no index are only used while a canonical form is being found.
+    '''
+    def __init__(self, leftOptions, rightOptions, index = None):
+        self.leftOptions = leftOptions
+        self.rightOptions = rightOptions
+        self.index = index
+
+
+    '''
+    Returns the value written out, such as {0|*} or {1|-1}, with integers for the simplest values.
+    '''
+    def __repr__(self):
+        if (self is ZERO):
+            return '0'
+        if (self.rightOptions == () and self.leftOptions == (ZERO,)):
+            return '1'
+        if (self.leftOptions == () and self.rightOptions == (ZERO,)):
+            return '-1'
+        if (self.leftOptions == (ZERO,) and self.rightOptions == (ZERO,)):
+            return '*'
+        leftText = ','.join(repr(option) for option in self.leftOptions)
+        rightText = ','.join(repr(option) for option in self.rightOptions)
+        return '{' + leftText + '|' + rightText + '}'
+
+
+# Canonical values keyed by the indices of their left and right options, so each one is built only once
+CANONICAL_VALUES = {}
+ZERO = GameValue((), (), 0)
+CANONICAL_VALUES[(frozenset(), frozenset())] = ZERO
+
+# Results of lessOrEqual for pairs of canonical values, and sums of pairs of canonical values
+COMPARISONS = {}
+SUMS = {}
+
+
+'''
+This function compares two values. G <= H unless some left option of G is >= H or some right option of H is <= G.
+Accepts two GameValues. Returns True if the first is less than or equal to the second.
+'''
+def lessOrEqual(game, otherGame):
+    if (game is otherGame):
+        return True
+    comparisonKey = None
+    if (game.index is not None and otherGame.index is not None):
+        comparisonKey = (game.index, otherGame.index)
+        result = COMPARISONS.get(comparisonKey)
+        if (result is not None):
+            return result
+
+    result = True
+    for leftOption in game.leftOptions:
+        if (lessOrEqual(otherGame, leftOption)):
+            result = False
+            break
+    if (result):
+        for rightOption in otherGame.rightOptions:
+            if (lessOrEqual(rightOption, game)):
+                result = False
+                break
+
+    if (comparisonKey is not None):
+        if (len(COMPARISONS) >= MAX_COMPARISONS):
+            COMPARISONS.clear()
+        COMPARISONS[comparisonKey] = result
+    return result
+
+
+'''
+Returns the options that are not dominated by another option. Left keeps its largest options, and right keeps its
+smallest options.
+'''
+def removeDominated(options, isLeft):
+    undominated = []
+    for option in options:
+        dominated = False
+        for otherOption in options:
+            if (otherOption is not option):
+                if (isLeft and lessOrEqual(option, otherOption)) or (not isLeft and lessOrEqual(otherOption, option)):
+                    dominated = True
+                    break
+        if (not dominated):
+            undominated.append(option)
+    return undominated
+
+
+'''
+Returns the options without repeats, keeping the first of each.
+'''
+def uniqueOptions(options):
+    unique = []
+    for option in options:
+        if (not any(option is seen for seen in unique)):
+            unique.append(option)
+    return unique
+
+
+'''
+This function builds the canonical form of {left options | right options}.
+Dominated options are removed, and reversible options are bypassed: a left option A is reversible when one of
+its right options AR is <= G, and is then replaced by the left options of AR (and the other way around for right
+options). Both steps keep the value the same, and when neither applies the form is canonical.
+Accepts lists of canonical GameValues. Returns the canonical GameValue.
+'''
+def makeGame(leftOptions, rightOptions):
+    leftOptions = uniqueOptions(leftOptions)
+    rightOptions = uniqueOptions(rightOptions)
+    while (True):
+        leftOptions = removeDominated(leftOptions, True)
+        rightOptions = removeDominated(rightOptions, False)
+        game = GameValue(tuple(leftOptions), tuple(rightOptions))
+
+        bypassed = False
+        for optionIndex, leftOption in enumerate(leftOptions):
+            for reversingOption in leftOption.rightOptions:
+                if (lessOrEqual(reversingOption, game)):
+                    leftOptions = uniqueOptions(leftOptions[:optionIndex] + leftOptions[optionIndex+1:] + list(reversingOption.leftOptions))
+                    bypassed = True
+                    break
+            if (bypassed):
+                break
+        if (not bypassed):
+            for optionIndex, rightOption in enumerate(rightOptions):
+                for reversingOption in rightOption.leftOptions:
+                    if (lessOrEqual(game, reversingOption)):
+                        rightOptions = uniqueOptions(rightOptions[:optionIndex] + rightOptions[optionIndex+1:] + list(reversingOption.rightOptions))
+                        bypassed = True
+                        break
+                if (bypassed):
+                    break
+        if (not bypassed):
+            break
+
+    canonicalKey = (frozenset(option.index for option in leftOptions), frozenset(option.index for option in rightOptions))
+    canonicalGame = CANONICAL_VALUES.get(canonicalKey)
+    if (canonicalGame is None):
+        canonicalGame = GameValue(tuple(leftOptions), tuple(rightOptions), len(CANONICAL_VALUES))
+        CANONICAL_VALUES[canonicalKey] = canonicalGame
+    return canonicalGame
+
+
+'''
+This function adds two values: in G + H a player moves in either G or H.
+Accepts two canonical GameValues. Returns the canonical GameValue of the sum.
+'''
+def addGames(game, otherGame):
+    if (game is ZERO):
+        return otherGame
+    if (otherGame is ZERO):
+        return game
+    sumKey = (min(game.index, otherGame.index), max(game.index, otherGame.index))
+    total = SUMS.get(sumKey)
+    if (total is None):
+        leftOptions = [addGames(option, otherGame) for option in game.leftOptions] + [addGames(game, option) for option in otherGame.leftOptions]
+        rightOptions = [addGames(option, otherGame) for option in game.rightOptions] + [addGames(game, option) for option in otherGame.rightOptions]
+        total = makeGame(leftOptions, rightOptions)
+        SUMS[sumKey] = total
+    return total
+
+
+'''
+This function decides whether the player who just moved to a value wins, with the opponent to move next.
+Dark wins G moving second when G >= 0, and light wins it when G <= 0.
+'''
+def secondPlayerWins(game, color):
+    if (color == 'X'):
+        return lessOrEqual(ZERO, game)
+    return lessOrEqual(game, ZERO)
+
+
+# Region values keyed by the contents of the region, in the same form for every rotation and reflection, and the
+# same values keyed by the region and its pieces as they are on the board, which is quicker to look up
+REGION_VALUES = {}
+BOARD_REGION_VALUES = {}
+
+
+'''
+Raised inside a valuation when it computes more region positions than its budget.
+'''
+class RegionBudgetExceeded(Exception):
+    pass
+
+
+'''
+Raised inside a valuation when a move in the region reaches squares outside it. Holds the move's footprint.
+'''
+class RegionGrown(Exception):
+    pass
+
+
+class RegionAnalyzer:
+
+    '''
+    Constructor
+    Accepts the number of region positions one bot move may value before it gives up.
+    '''
+    def __init__(self, positionBudget = REGION_POSITION_BUDGET):
+        self.positionBudget = positionBudget
+        self.remainingPositions = positionBudget
+        self.valuations = 0
+        self.failedValuations = 0
+        self.lastRegionCount = 0
+
+
+    '''
+    This function adds a set of squares to a list of regions, merging it with every region it is near.
+    Two regions are merged when a square of one is within two squares of the other along a row or column. Farther
+    apart, no move can join them: every move starts with a jump over one square onto the next, so a move that
+    neither region can make alone would have to start in one region and jump over or onto a square of the other.
+    Returns the new list of regions.
+    '''
+    def addToRegions(self, regions, squares, tables):
+        nearSquares = self.getNearSquares(squares, tables)
+        separateRegions = []
+        for region in regions:
+            if (region & nearSquares):
+                squares = squares | region
+            else:
+                separateRegions.append(region)
+        if (len(separateRegions) < len(regions)):
+            # The merged region may now be near a region it was not near before
+            return self.addToRegions(separateRegions, squares, tables)
+        return separateRegions + [squares]
+
+
+    '''
+    Returns the squares, including the given ones, that are within two squares of the given squares along a row or
+    column.
+    '''
+    def getNearSquares(self, squares, tables):
+        nearSquares = squares
+        for rowStep, colStep, step, forwardMasks in tables.directions:
+            for steps in (1, 2):
+                if (step > 0):
+                    nearSquares = nearSquares | ((squares & forwardMasks[steps]) << steps*step)
+                else:
+                    nearSquares = nearSquares | ((squares & forwardMasks[steps]) >> -steps*step)
+        return nearSquares
+
+
+    '''
+    Returns the key of a region's contents: its squares and pieces and those of the squares near it, moved to the
+    top left corner, in the smallest form over the 8 rotations and reflections of the board.
+    Moves in the region only depend on its squares, but whether one of them can ever reach outside it depends on
+    the squares near it as well, so both are in the key. Regions with the same key have the same value.
+    '''
+    def getRegionKey(self, gameState, region, nearSquares):
+        squareCoordinates = gameState.tables.squareCoordinates
+        contents = []
+        squares = nearSquares
+        while (squares):
+            lowestBit = squares & -squares
+            squares = squares ^ lowestBit
+            if (gameState.pieces['X'] & lowestBit):
+                piece = 'X'
+            elif (gameState.pieces['O'] & lowestBit):
+                piece = 'O'
+            else:
+                piece = '.'
+            if (not region & lowestBit):
+                piece = piece.lower()
+            row, col = squareCoordinates[lowestBit.bit_length() - 1]
+            contents.append((row, col, piece))
+
+        regionKey = None
+        for rowSign, colSign, swap in ((1, 1, False), (1, -1, False), (-1, 1, False), (-1, -1, False),
+                                       (1, 1, True), (1, -1, True), (-1, 1, True), (-1, -1, True)):
+            if (swap):
+                transformed = [(rowSign*col, colSign*row, piece) for row, col, piece in contents]
+            else:
+                transformed = [(rowSign*row, colSign*col, piece) for row, col, piece in contents]
+            minRow = min(transformed)[0]
+            minCol = min(col for row, col, piece in transformed)
+            transformedKey = tuple(sorted([(row - minRow, col - minCol, piece) for row, col, piece in transformed]))
+            if (regionKey is None or transformedKey < regionKey):
+                regionKey = transformedKey
+        return regionKey
+
+
+    '''
+    This function computes the value of a region, whose moves are the moves dark (left) and light (right) can make
+    in it, by either player in any order, since in a sum a player may move twice in a row in the same region.
+    Values are kept in REGION_VALUES, so a region of the same shape is only valued once.
+    Accepts the position, a region and the squares near it (see getNearSquares). Raises RegionGrown if a move in
+    the region reaches outside it, since then the region is not independent of the rest of the board.
+    Returns the canonical GameValue.
+    '''
+    def getRegionValue(self, gameState, region, nearSquares):
+        boardKey = (gameState.boardSize, region, gameState.pieces['X'] & nearSquares, gameState.pieces['O'] & nearSquares)
+        value = BOARD_REGION_VALUES.get(boardKey)
+        if (value is not None):
+            return value
+        regionKey = self.getRegionKey(gameState, region, nearSquares)
+        value = REGION_VALUES.get(regionKey)
+
+        if (value is None):
+            self.remainingPositions = self.remainingPositions - 1
+            if (self.remainingPositions < 0):
+                raise RegionBudgetExceeded()
+
+            moveFootprints = gameState.tables.moveFootprints
+            options = {}
+            for curColor, opponentColor in (('X', 'O'), ('O', 'X')):
+                options[curColor] = []
+                for action in gameState.getLegalActions(curColor, opponentColor):
+                    footprint = moveFootprints[action]
+                    if (footprint & region):
+                        if (footprint | region != region):
+                            raise RegionGrown(footprint)
+                        undoRecord = gameState.makeMove(action, curColor, opponentColor)
+                        options[curColor].append(self.getRegionValue(gameState, region, nearSquares))
+                        gameState.unmakeMove(undoRecord)
+            value = makeGame(options['X'], options['O'])
+
+            if (len(REGION_VALUES) >= MAX_REGION_VALUES):
+                REGION_VALUES.clear()
+            REGION_VALUES[regionKey] = value
+
+        if (len(BOARD_REGION_VALUES) >= MAX_REGION_VALUES):
+            BOARD_REGION_VALUES.clear()
+        BOARD_REGION_VALUES[boardKey] = value
+        return value
+
+
+    '''
+    This function splits the board into regions that can never interact and values each one.
+    Every move that can be played now starts a region, made of the squares the move starts from, jumps over or
+    lands on (its footprint, see gameState.py). When valuing a region turns up a move that reaches outside it, the
+    region takes in the move's squares, merges with the regions near it, and the regions are valued again, until
+    every region is closed under play in it and far enough from the others.
+    Accepts the position. Returns the list of region bitboards and the list of their values, or None if the
+    regions merge into one, which leaves a single game that is no easier to value than to search.
+    Raises RegionBudgetExceeded if the regions take more positions to value than the budget.
+    '''
+    def findRegions(self, gameState):
+        tables = gameState.tables
+        regions = []
+        for curColor, opponentColor in (('X', 'O'), ('O', 'X')):
+            for action in gameState.getLegalActions(curColor, opponentColor):
+                regions = self.addToRegions(regions, tables.moveFootprints[action], tables)
+
+        while (len(regions) > 1):
+            regionValues = []
+            try:
+                for region in regions:
+                    regionValues.append(self.getRegionValue(gameState, region, self.getNearSquares(region, tables)))
+                return regions, regionValues
+            except RegionGrown as grown:
+                # Moves made by the valuation that was cut short are undone on a fresh copy of the position
+                gameState = GameState(self.rootState)
+                regions.remove(region)
+                regions = self.addToRegions(regions, region | grown.args[0], tables)
+        return None
+
+
+    '''
+    This function looks for a winning move by adding up the region values.
+    Accepts the position, the color to move and its legal actions.
+    Returns a move after which the total value is a win for the mover, or None if the position is lost, does not
+    split into regions, or the valuation ran past its budget.
+    '''
+    def selectWinningAction(self, gameState, curColor, opponentColor, allLegalActions):
+        self.valuations = self.valuations + 1
+        self.remainingPositions = self.positionBudget
+
+        # The valuation makes moves on a copy, so giving up part way does not leave moves on the caller's board
+        self.rootState = gameState
+        try:
+            regionsFound = self.findRegions(GameState(gameState))
+        except RegionBudgetExceeded:
+            regionsFound = None
+        finally:
+            self.rootState = None
+        if (regionsFound is None):
+            self.failedValuations = self.failedValuations + 1
+            return None
+        regions, regionValues = regionsFound
+        self.lastRegionCount = len(regions)
+
+        moveFootprints = gameState.tables.moveFootprints
+        otherTotals = {}
+        for action in allLegalActions:
+            regionIndex = 0
+            while (not moveFootprints[action] & regions[regionIndex]):
+                regionIndex = regionIndex + 1
+            if (regionIndex not in otherTotals):
+                otherTotal = ZERO
+                for otherIndex in range(len(regions)):
+                    if (otherIndex != regionIndex):
+                        otherTotal = addGames(otherTotal, regionValues[otherIndex])
+                otherTotals[regionIndex] = otherTotal
+
+            # Every position after a move in a region was valued with the region, so this is a table lookup
+            undoRecord = gameState.makeMove(action, curColor, opponentColor)
+            region = regions[regionIndex]
+            movedValue = self.getRegionValue(gameState, region, self.getNearSquares(region, gameState.tables))
+            gameState.unmakeMove(undoRecord)
+            if (secondPlayerWins(addGames(movedValue, otherTotals[regionIndex]), curColor)):
+                return action
+        return None
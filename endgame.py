@@ -0,0 +1,231 @@
+'''
+Exact endgame solver. Once few moves or pieces are left, a Konane position can be searched to the end of the game,
+which decides whether the side to move wins (the player left without a move loses).
+
+Solved positions are kept in an EndgameTable, a hash table of 64-bit slots keyed by the position hash. With a file
+path the table is a memory-mapped file, so every process that opens the same file shares the results without
+reading the whole table into memory, and the results are kept from one run to the next.
+'''
+
+from gameState import GameState, BOARD_SIZE, getBoardTables
+import mmap
+import os
+import struct
+
+# A position is solved once both players together have at most this many moves, or at most this many pieces are left
+ENDGAME_MOBILITY = 6
+ENDGAME_PIECES = 16
+
+# Solver nodes one solve may search before it gives up, leaving the position to the evaluation function
+ENDGAME_NODE_BUDGET = 5000
+
+# Number of positions the solver gave up on that it remembers, so that it does not try them again
+MAX_FAILED_POSITIONS = 2**16
+
+# Table file layout: a header (magic, version, board size, number of slots, Zobrist fingerprint), then the slots
+TABLE_MAGIC = b'KONANEDB'
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct('<8sIIQQ')
+SLOT = struct.Struct('<Q')
+
+# Slots hold the position hash with its two lowest bits replaced by the result for the side to move, 0 when empty
+LOSS = 1
+WIN = 2
+RESULT_MASK = 3
+
+# Number of consecutive slots a position may be stored in
+PROBE_LIMIT = 4
+
+
+'''
+Raised inside the solver when a solve runs past its node budget.
+'''
+class EndgameBudgetExceeded(Exception):
+    pass
+
+
+class EndgameTable:
+
+    '''
+    Constructor
+    Accepts the path of the table file, or None for a table that only lives in this process, the board size, and the
+    number of slots (rounded up to a power of 2) of a new table. An existing file keeps its own number of slots.
+    '''
+    def __init__(self, path = None, boardSize = BOARD_SIZE, numOfSlots = 2**20):
+        self.path = path
+        self.tableFile = None
+        numOfSlots = 1 << (numOfSlots - 1).bit_length()
+        # The first Zobrist key identifies the hashing scheme, so a table written with other keys is never read
+        fingerprint = getBoardTables(boardSize).zobristKeys['X'][0]
+
+        if (path is None):
+            self.slots = bytearray(TABLE_HEADER.size + numOfSlots * SLOT.size)
+            TABLE_HEADER.pack_into(self.slots, 0, TABLE_MAGIC, TABLE_VERSION, boardSize, numOfSlots, fingerprint)
+        else:
+            if (not os.path.exists(path) or os.path.getsize(path) < TABLE_HEADER.size):
+                with open(path, 'wb') as newFile:
+                    newFile.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, boardSize, numOfSlots, fingerprint))
+                    newFile.truncate(TABLE_HEADER.size + numOfSlots * SLOT.size)
+            self.tableFile = open(path, 'r+b')
+            self.slots = mmap.mmap(self.tableFile.fileno(), 0)
+
+        magic, version, tableBoardSize, numOfSlots, tableFingerprint = TABLE_HEADER.unpack_from(self.slots, 0)
+        if (magic != TABLE_MAGIC or version != TABLE_VERSION or tableFingerprint != fingerprint):
+            self.close()
+            raise ValueError(str(path) + ' is not an endgame table of this version')
+        if (tableBoardSize != boardSize):
+            self.close()
+            raise ValueError(str(path) + ' is an endgame table of the ' + str(tableBoardSize) + 'x' + str(tableBoardSize) + ' board')
+        if (len(self.slots) < TABLE_HEADER.size + numOfSlots * SLOT.size):
+            self.close()
+            raise ValueError(str(path) + ' is shorter than its header says')
+        self.slotMask = numOfSlots - 1
+
+
+    '''
+    This function looks up a position. Accepts the position hash with the side to move.
+    Returns WIN or LOSS for the side to move, or None if the position has not been solved.
+    '''
+    def probe(self, hashKey):
+        key = hashKey & ~RESULT_MASK
+        index = hashKey & self.slotMask
+        for probe in range(PROBE_LIMIT):
+            offset = TABLE_HEADER.size + ((index + probe) & self.slotMask) * SLOT.size
+            slot = SLOT.unpack_from(self.slots, offset)[0]
+            if (slot == 0):
+                return None
+            if (slot & ~RESULT_MASK == key):
+                return slot & RESULT_MASK
+        return None
+
+
+    '''
+    This function stores the result of a solved position in the first free slot after its index, or replaces the
+    first slot when they are all taken.
+    A slot is written as one 8 byte word, so a reader in another process sees the old or the new slot. A slot
+    that is torn anyway does not match any position and reads as a miss.
+    '''
+    def store(self, hashKey, result):
+        key = hashKey & ~RESULT_MASK
+        index = hashKey & self.slotMask
+        target = index
+        for probe in range(PROBE_LIMIT):
+            slotIndex = (index + probe) & self.slotMask
+            slot = SLOT.unpack_from(self.slots, TABLE_HEADER.size + slotIndex * SLOT.size)[0]
+            if (slot == 0 or slot & ~RESULT_MASK == key):
+                target = slotIndex
+                break
+        SLOT.pack_into(self.slots, TABLE_HEADER.size + target * SLOT.size, key | result)
+
+
+    '''
+    This function writes the table to its file, if it has one.
+    '''
+    def flush(self):
+        if (self.tableFile is not None):
+            self.slots.flush()
+
+
+    '''
+    This function writes the table to its file and closes it.
+    '''
+    def close(self):
+        if (self.tableFile is not None):
+            self.slots.flush()
+            self.slots.close()
+            self.tableFile.close()
+            self.tableFile = None
+
+
+class EndgameSolver:
+
+    '''
+    Constructor
+    Accepts the table solved positions are kept in, the mobility and piece count thresholds below which positions
+    are solved, and the node budget of one solve.
+    '''
+    def __init__(self, table, mobilityThreshold = ENDGAME_MOBILITY, pieceThreshold = ENDGAME_PIECES,
+                 nodeBudget = ENDGAME_NODE_BUDGET):
+        self.table = table
+        self.mobilityThreshold = mobilityThreshold
+        self.pieceThreshold = pieceThreshold
+        self.nodeBudget = nodeBudget
+        self.failedPositions = set()
+        self.solverNodes = 0
+        self.solves = 0
+        self.failedSolves = 0
+
+
+    '''
+    This function decides whether a position is small enough to be solved.
+    '''
+    def isEndgame(self, gameState, curColor, opponentColor):
+        if (gameState.mobility[curColor] + gameState.mobility[opponentColor] <= self.mobilityThreshold):
+            return True
+        return bin(gameState.pieces['X'] | gameState.pieces['O']).count('1') <= self.pieceThreshold
+
+
+    '''
+    This function solves a position for the side to move.
+    Accepts the position and the current and opponent player colors.
+    Returns True if the side to move wins with perfect play, False if it loses, or None if the solve ran past its
+    node budget. Positions solved on the way are kept in the table even when the solve gives up, and a position
+    the solver gave up on is not tried again.
+    '''
+    def solve(self, gameState, curColor, opponentColor):
+        hashKey = gameState.getHashKey(curColor)
+        result = self.table.probe(hashKey)
+        if (result is not None):
+            return result == WIN
+        if (hashKey in self.failedPositions):
+            return None
+
+        # The solver makes moves on a copy, so giving up part way does not leave moves on the caller's board
+        self.remainingNodes = self.nodeBudget
+        try:
+            curWins = self.solveNode(GameState(gameState), curColor, opponentColor)
+        except EndgameBudgetExceeded:
+            self.failedSolves = self.failedSolves + 1
+            if (len(self.failedPositions) >= MAX_FAILED_POSITIONS):
+                self.failedPositions.clear()
+            self.failedPositions.add(hashKey)
+            return None
+        finally:
+            self.solverNodes = self.solverNodes + self.nodeBudget - self.remainingNodes
+        self.solves = self.solves + 1
+        return curWins
+
+
+    '''
+    This is the recursive function of the solver. The side to move wins if some move leaves the opponent in a lost
+    position. Moves that leave the opponent the fewest replies are tried first, since they end the game soonest.
+    '''
+    def solveNode(self, gameState, curColor, opponentColor):
+        hashKey = gameState.getHashKey(curColor)
+        result = self.table.probe(hashKey)
+        if (result is not None):
+            return result == WIN
+        self.remainingNodes = self.remainingNodes - 1
+        if (self.remainingNodes < 0):
+            raise EndgameBudgetExceeded()
+
+        orderedActions = []
+        for action in gameState.getLegalActions(curColor, opponentColor):
+            undoRecord = gameState.makeMove(action, curColor, opponentColor)
+            opponentMobility = gameState.mobility[opponentColor]
+            gameState.unmakeMove(undoRecord)
+            if (opponentMobility == 0):
+                self.table.store(hashKey, WIN)
+                return True
+            orderedActions.append((opponentMobility, action))
+        orderedActions.sort(key=lambda entry: entry[0])
+
+        for opponentMobility, action in orderedActions:
+            undoRecord = gameState.makeMove(action, curColor, opponentColor)
+            opponentWins = self.solveNode(gameState, opponentColor, curColor)
+            gameState.unmakeMove(undoRecord)
+            if (not opponentWins):
+                self.table.store(hashKey, WIN)
+                return True
+        self.table.store(hashKey, LOSS)
+        return False
@@ -0,0 +1,500 @@
+'''
+Engine server. Runs the bot as a long-running process that answers commands written one per line, over stdin and
+stdout or over a local TCP socket, so that other programs can play through it. The Game of each color and board
+size is kept between requests, so its transposition table and move ordering stay warm from one move to the next.
+
+Commands:
+    position startpos [size <n>] [moves <move> ...]   the starting position after both opening removals, on an
+                                                      n x n board, then the given moves
+    position board <rows> <X|O> [moves <move> ...]    a board written as rows of X, O and . joined by '/', the
+                                                      color to move, then the given moves
+    go [depth <n>] [movetime <ms>] [infinite]         search the position for the player to move, until the depth
+                                                      or move time is reached or stop is sent, then answer
+                                                      "bestmove <move>", or "bestmove none" if it has no move
+    ponder                                            search the replies of the player not to move to every move
+                                                      of the player to move, until stop or another search
+    stop                                              end the current search early
+    isready                                           answer "readyok"
+    quit                                              stop and close the connection (on stdin, exit)
+A move is its squares, 1-based row,col as in konane.py, joined by '-', e.g. 6,4-4,4 or 6,4-4,4-2,4.
+Before bestmove the search answers "info depth <n> score <score> nodes <n> time <ms> pv <move> ...", where the score
+is for the player to move, or "win <plies>" / "loss <plies>" once the search has proved the result.
+Errors are answered with "info string <message>".
+
+Searches run one at a time in a worker thread while the event loop keeps reading commands, so stop, isready and
+new positions are handled during a search. Searches run in the order they were asked for, across connections, and
+each go is answered, in order, even when stopped. A go stops a running ponder, and a ponder with a search waiting
+behind it does not start. If the position of a go is one move past a pondered position, a reply pondered at least as deep as
+the search would reach is played instead.
+
+Example:
+    python engineServer.py --endgame
+    python engineServer.py --port 7070 --depth 8
+'''
+
+from game import Game, WIN_SCORE, WIN_THRESHOLD, MAX_SCORE
+from gameState import GameState, BOARD_SIZE, getOpeningRemovals
+from openingBook import BOOK_PATH
+import argparse
+import asyncio
+import concurrent.futures
+import sys
+import threading
+import time
+
+# Depth of a go without a depth, move time or infinite, and of pondering
+DEFAULT_DEPTH = 6
+
+
+'''
+This function writes an action in the protocol's notation: its 1-based row,col squares joined by '-'.
+'''
+def formatAction(action):
+    return '-'.join(str(row + 1) + ',' + str(col + 1) for row, col in action)
+
+
+'''
+This function reads an action written in the protocol's notation.
+Returns the action in the tuple form getLegalActions returns, or None if the text is not a move.
+'''
+def parseAction(actionText):
+    action = []
+    for squareText in actionText.split('-'):
+        fields = squareText.split(',')
+        if (len(fields) != 2 or not fields[0].isdigit() or not fields[1].isdigit()):
+            return None
+        action.append((int(fields[0]) - 1, int(fields[1]) - 1))
+    return tuple(action) if (len(action) > 1) else None
+
+
+'''
+This function writes a search score for the protocol: the score itself, or the plies to a proved win or loss.
+'''
+def formatScore(score):
+    if (score > WIN_THRESHOLD):
+        return 'win ' + str(WIN_SCORE - score)
+    if (score < -WIN_THRESHOLD):
+        return 'loss ' + str(WIN_SCORE + score)
+    return str(score)
+
+
+class EngineServer:
+
+    '''
+    Constructor
+    Accepts the depth of a go without limits and of pondering, the number of transposition table entries of each
+    Game, the endgame solver settings, and an opening book, which is only used on the board size it was built for.
+    '''
+    def __init__(self, defaultDepth = DEFAULT_DEPTH, tableSize = 2**20, boardSize = BOARD_SIZE, useEndgameSolver = False,
+                 endgamePath = None, openingBookPath = None):
+        self.defaultDepth = defaultDepth
+        self.tableSize = tableSize
+        self.boardSize = boardSize
+        self.useEndgameSolver = useEndgameSolver
+        self.endgamePath = endgamePath
+        self.openingBookPath = openingBookPath
+
+        # Games kept warm between requests, keyed by (board size, color they play)
+        self.games = {}
+
+        # Every search runs in the one search thread, in the order the requests came in
+        self.searchExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.searchLock = asyncio.Lock()
+
+        # Searches waiting for their turn that are not ponder searches, the Game of the running ponder search, if any,
+        # and the position each Game last finished pondering
+        self.waitingSearches = 0
+        self.ponderGame = None
+        self.ponderedKeys = {}
+
+        # Open the default board size's Games now, so that a bad book or endgame table file is reported at startup
+        for color in ('X', 'O'):
+            self.getGame(boardSize, color)
+
+
+    '''
+    This function returns the Game that plays a color on a board size, creating it on first use.
+    '''
+    def getGame(self, boardSize, botColor):
+        game = self.games.get((boardSize, botColor))
+        if (game is None):
+            playerColor = 'O' if (botColor == 'X') else 'X'
+            openingBookPath = self.openingBookPath if (boardSize == self.boardSize) else None
+            game = Game(playerColor, botColor, 3, self.defaultDepth, tableSize = self.tableSize, boardSize = boardSize,
+                        useEndgameSolver = self.useEndgameSolver, endgamePath = self.endgamePath,
+                        openingBookPath = openingBookPath)
+            self.games[(boardSize, botColor)] = game
+        return game
+
+
+    '''
+    This function runs a search function in the search thread, once every search requested before it has finished.
+    Pondering only fills time nobody asked for, so other searches stop a running ponder search, and a ponder search
+    that gets its turn while another search waits, or after its session's input ended, does not run.
+    Accepts the session asking, the Game that searches, whether it is a ponder search, and the function and its
+    arguments. Returns what the function returns, or None if it did not run.
+    '''
+    async def runSearch(self, session, game, isPonder, searchFunction, *args):
+        if (not isPonder):
+            if (self.ponderGame is not None):
+                self.ponderGame.searchStop = True
+            self.waitingSearches = self.waitingSearches + 1
+        async with self.searchLock:
+            if (not isPonder):
+                self.waitingSearches = self.waitingSearches - 1
+            elif (self.waitingSearches > 0 or session.inputEnded):
+                return None
+            # A stop sent while the search waited for its turn ends it at the first check of the clock
+            game.searchStop = session.stopRequested
+            session.searchGame = game
+            if (isPonder):
+                self.ponderGame = game
+            session.searchStart = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.searchExecutor, searchFunction, *args)
+            finally:
+                session.searchGame = None
+                self.ponderGame = None
+                game.searchStop = False
+
+
+    '''
+    This function stops any running search, then closes every Game's workers, endgame table and opening book, and
+    the search thread.
+    '''
+    def close(self):
+        for game in self.games.values():
+            game.searchStop = True
+        self.searchExecutor.shutdown()
+        for game in self.games.values():
+            game.close()
+
+
+class EngineSession:
+
+    '''
+    Constructor
+    Accepts the server and the function that writes one line of output to the client. A session starts at the
+    starting position of the server's board size.
+    '''
+    def __init__(self, server, writeLine):
+        self.server = server
+        self.writeLine = writeLine
+        self.searchTasks = []
+        self.searchGame = None
+        self.searchStart = None
+        self.stopRequested = False
+        self.inputEnded = False
+        self.setPosition(self.startPosition(server.boardSize), 'X', [])
+
+
+    '''
+    Returns the starting position of a board size, after both opening removals.
+    '''
+    def startPosition(self, boardSize):
+        gameState = GameState(boardSize = boardSize)
+        darkRemoval, lightRemoval = getOpeningRemovals(boardSize)
+        gameState.applyAction(darkRemoval, 'X', 'O')
+        gameState.applyAction(lightRemoval, 'O', 'X')
+        return gameState
+
+
+    '''
+    This function makes the given moves from a position and keeps the result as the session's position, along with
+    the position before the last move, which a pondered reply is looked up by.
+    Returns None, or an error message if a move is not legal, in which case the position is not changed.
+    '''
+    def setPosition(self, gameState, curColor, actionTexts):
+        opponentColor = 'O' if (curColor == 'X') else 'X'
+        prevHashKey = None
+        lastAction = None
+        for actionText in actionTexts:
+            action = parseAction(actionText)
+            if (action is None or action not in gameState.getLegalActions(curColor, opponentColor)):
+                return 'illegal move ' + actionText
+            prevHashKey = gameState.getHashKey(curColor)
+            gameState.makeMove(action, curColor, opponentColor)
+            lastAction = action
+            curColor, opponentColor = opponentColor, curColor
+        self.gameState = gameState
+        self.curColor = curColor
+        self.opponentColor = opponentColor
+        self.prevHashKey = prevHashKey
+        self.lastAction = lastAction
+        return None
+
+
+    '''
+    This function parses the arguments of a position command and sets the position.
+    Returns None, or an error message.
+    '''
+    def parsePosition(self, fields):
+        actionTexts = []
+        if ('moves' in fields):
+            actionTexts = fields[fields.index('moves') + 1:]
+            fields = fields[:fields.index('moves')]
+        try:
+            if (len(fields) == 1 and fields[0] == 'startpos'):
+                return self.setPosition(self.startPosition(self.server.boardSize), 'X', actionTexts)
+            if (len(fields) == 3 and fields[0] == 'startpos' and fields[1] == 'size'):
+                return self.setPosition(self.startPosition(int(fields[2])), 'X', actionTexts)
+            if (len(fields) == 3 and fields[0] == 'board' and fields[2] in ('X', 'O')):
+                rows = fields[1].split('/')
+                gameState = GameState(boardSize = len(rows))
+                gameState.setBoard(rows)
+                return self.setPosition(gameState, fields[2], actionTexts)
+        except ValueError as error:
+            return str(error)
+        return 'position must be "startpos [size <n>]" or "board <rows> <X|O>", then optionally "moves <move> ..."'
+
+
+    '''
+    This function parses the arguments of a go command.
+    Returns (depth limit, move time in milliseconds or None), or an error message.
+    '''
+    def parseGo(self, fields):
+        depthLimit = None
+        moveTime = None
+        index = 0
+        while (index < len(fields)):
+            if (fields[index] == 'infinite'):
+                depthLimit = self.gameState.tables.numOfSquares
+                index = index + 1
+            elif (fields[index] in ('depth', 'movetime') and index + 1 < len(fields) and fields[index + 1].isdigit()):
+                if (fields[index] == 'depth'):
+                    depthLimit = max(int(fields[index + 1]), 1)
+                else:
+                    moveTime = int(fields[index + 1])
+                index = index + 2
+            else:
+                return 'go takes depth <n>, movetime <ms> or infinite, got ' + ' '.join(fields)
+        if (depthLimit is None and moveTime is None):
+            depthLimit = self.server.defaultDepth
+        return depthLimit, moveTime
+
+
+    '''
+    This function handles one command line. Returns False once the session should end.
+    '''
+    async def handleCommand(self, line):
+        fields = line.split()
+        if (len(fields) == 0):
+            return True
+        command = fields[0]
+        if (command == 'isready'):
+            self.writeLine('readyok')
+        elif (command == 'stop'):
+            await self.stopSearch()
+        elif (command == 'quit'):
+            await self.stopSearch()
+            return False
+        elif (command == 'position'):
+            error = self.parsePosition(fields[1:])
+            if (error is not None):
+                self.writeLine('info string ' + error)
+        elif (command == 'go'):
+            searchLimits = self.parseGo(fields[1:])
+            if (isinstance(searchLimits, str)):
+                self.writeLine('info string ' + searchLimits)
+            else:
+                self.startSearch(self.search(GameState(self.gameState), self.curColor, self.opponentColor, self.prevHashKey,
+                                             self.lastAction, searchLimits[0], searchLimits[1]))
+        elif (command == 'ponder'):
+            self.startSearch(self.ponder(GameState(self.gameState), self.curColor, self.opponentColor))
+        else:
+            self.writeLine('info string unknown command ' + command)
+        return True
+
+
+    '''
+    This function starts a search of the session as a task, so that commands are read while it runs. The search
+    waits for the session's previous search, so answers come in the order they were asked for, and a running ponder
+    search is stopped so that it does not hold up the new one.
+    '''
+    def startSearch(self, searchCoroutine):
+        if (self.searchGame is not None and self.searchGame is self.server.ponderGame):
+            self.searchGame.searchStop = True
+        self.searchTasks = [task for task in self.searchTasks if (not task.done())]
+        prevTask = self.searchTasks[-1] if (len(self.searchTasks) > 0) else None
+        self.searchTasks.append(asyncio.ensure_future(self.runAfter(prevTask, searchCoroutine)))
+
+
+    '''
+    This function runs a search coroutine once the previous search, if any, has answered.
+    '''
+    async def runAfter(self, prevTask, searchCoroutine):
+        if (prevTask is not None):
+            await prevTask
+        await searchCoroutine
+
+
+    '''
+    This function stops the session's searches, running or waiting to run, and waits for them to answer.
+    '''
+    async def stopSearch(self):
+        self.stopRequested = True
+        if (self.searchGame is not None):
+            self.searchGame.searchStop = True
+        for task in self.searchTasks:
+            await task
+        self.searchTasks = []
+        self.stopRequested = False
+
+
+    '''
+    This function waits for the session's searches to finish on their own once its input has ended, except ponder
+    searches, which only end at their depth, so they are stopped or skipped.
+    '''
+    async def finishSearch(self):
+        self.inputEnded = True
+        if (self.searchGame is not None and self.searchGame is self.server.ponderGame):
+            self.searchGame.searchStop = True
+        for task in self.searchTasks:
+            await task
+        self.searchTasks = []
+
+
+    '''
+    This function searches a position for the player to move and answers with the best move.
+    Accepts the position, its colors, the hash key of the position before its last move and that move, and the
+    search limits.
+    The opening book is tried first. A reply pondered for the last move is played without a search if it was
+    searched at least to the depth limit, or with a move time, if it was searched deeper than the search got.
+    '''
+    async def search(self, gameState, curColor, opponentColor, prevHashKey, lastAction, depthLimit, moveTime):
+        allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+        if (len(allLegalActions) == 0):
+            self.writeLine('bestmove none')
+            return
+        game = self.server.getGame(gameState.boardSize, curColor)
+
+        if (game.openingBook is not None):
+            bookMove = game.openingBook.lookup(gameState, curColor, allLegalActions)
+            if (bookMove is not None):
+                self.writeLine('info string book move, searched to depth ' + str(bookMove[1]) + ' when the book was built')
+                self.writeLine('bestmove ' + formatAction(bookMove[0]))
+                return
+
+        ponderedReply = None
+        if (lastAction is not None and self.server.ponderedKeys.get((gameState.boardSize, curColor)) == prevHashKey):
+            ponderedReply = game.ponderReplies.get(lastAction)
+
+        # The pondered reply is handed to the search, which plays it instead of searching or of its own best move
+        # (see Game.selectMiniMaxAB). Without a move time a pondered reply it plays was never searched here.
+        action = await self.server.runSearch(self, game, False, game.selectMiniMaxAB, gameState, allLegalActions,
+                                             -MAX_SCORE, MAX_SCORE, moveTime, depthLimit, ponderedReply)
+        if (game.ponderHit is None or moveTime is not None):
+            elapsed = int((time.perf_counter() - self.searchStart) * 1000)
+            info = 'info depth ' + str(game.completedDepth) + ' score ' + formatScore(game.principalScore) + ' nodes ' + \
+                   str(game.searchNodes) + ' time ' + str(elapsed)
+            if (len(game.principalVariation) > 0):
+                info = info + ' pv ' + ' '.join(formatAction(pvAction) for pvAction in game.principalVariation)
+            self.writeLine(info)
+        if (game.ponderHit is not None):
+            self.writeLine('info string pondered reply, searched to depth ' + str(game.ponderHit[1]))
+        self.writeLine('bestmove ' + formatAction(action))
+
+
+    '''
+    This function ponders a position: the Game of the player not to move searches its replies to every move of
+    the player to move (see Game.ponder). It answers nothing. The replies are kept for the next go one move later.
+    '''
+    async def ponder(self, gameState, curColor, opponentColor):
+        # A search asked for after this one would only wait for it
+        if (len([task for task in self.searchTasks if (not task.done())]) > 1):
+            return
+        if (len(gameState.getLegalActions(curColor, opponentColor)) == 0):
+            return
+        game = self.server.getGame(gameState.boardSize, opponentColor)
+        ponderedKey = gameState.getHashKey(curColor)
+        self.server.ponderedKeys[(gameState.boardSize, opponentColor)] = None
+        game.ponderReplies = {}
+        await self.server.runSearch(self, game, True, game.ponder, gameState)
+        self.server.ponderedKeys[(gameState.boardSize, opponentColor)] = ponderedKey
+
+
+'''
+This function serves one session over stdin and stdout until quit or the end of input. At the end of input a go
+search still running is finished, so piped commands get their answers.
+Lines are read in a daemon thread, which a blocked read cannot keep the process alive with.
+'''
+async def serveStdio(server):
+    loop = asyncio.get_running_loop()
+    lines = asyncio.Queue()
+
+    def readLines():
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+        loop.call_soon_threadsafe(lines.put_nowait, None)
+    threading.Thread(target=readLines, daemon=True).start()
+
+    def writeLine(line):
+        sys.stdout.write(line + '\n')
+        sys.stdout.flush()
+
+    session = EngineSession(server, writeLine)
+    while (True):
+        line = await lines.get()
+        if (line is None):
+            await session.finishSearch()
+            break
+        if (not await session.handleCommand(line)):
+            break
+
+
+'''
+This function serves every connection to a local TCP port as its own session, sharing the server's Games, until
+the process is interrupted. A connection that closes stops its search.
+'''
+async def serveSocket(server, host, port):
+
+    async def serveConnection(reader, writer):
+        def writeLine(line):
+            if (not writer.is_closing()):
+                writer.write((line + '\n').encode())
+
+        session = EngineSession(server, writeLine)
+        try:
+            while (True):
+                line = await reader.readline()
+                if (not line or not await session.handleCommand(line.decode())):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            await session.stopSearch()
+            writer.close()
+
+    socketServer = await asyncio.start_server(serveConnection, host, port)
+    print('Engine listening on', host + ':' + str(port), file=sys.stderr)
+    async with socketServer:
+        await socketServer.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve the bot over a line protocol on stdin and stdout or a local socket.')
+    parser.add_argument('--port', type=int, help='listen on this TCP port instead of stdin and stdout')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on with --port')
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH, help='depth of a go without limits, and of pondering')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE, help='squares per side of the startpos board, 6 to 16')
+    parser.add_argument('--table-size', type=int, default=2**20, help='transposition table entries per color and board size')
+    parser.add_argument('--endgame', action='store_true', help='solve endgames exactly')
+    parser.add_argument('--endgame-db', help='endgame table file shared across runs (implies --endgame)')
+    parser.add_argument('--book', nargs='?', const=BOOK_PATH, help='play book moves from this opening book file')
+    args = parser.parse_args()
+
+    async def serve():
+        server = EngineServer(args.depth, args.table_size, args.board_size, args.endgame or args.endgame_db is not None,
+                              args.endgame_db, args.book)
+        try:
+            if (args.port is None):
+                await serveStdio(server)
+            else:
+                await serveSocket(server, args.host, args.port)
+        finally:
+            server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
@@ -3,26 +3,317 @@ Game object class. Game object actually runs an instance of the game and maintai
 details, logic, algorithms, players, etc.
 '''
 
-from gameState import GameState
+from gameState import GameState, BOARD_SIZE, getOpeningRemovals, toAction
+from endgame import EndgameSolver, EndgameTable
+from combinatorialGame import RegionAnalyzer
+from batchEvaluation import NUMPY_AVAILABLE, countMovesBatch
+from openingBook import OpeningBook
+from monteCarlo import MonteCarloTreeSearch
+from searchProfiler import SearchProfiler, MOVE_GENERATION, EVALUATION, MAKE_MOVE, COPY, SUBTREE
+import concurrent.futures
+import multiprocessing
 import random
 import math
+import threading
+import time
+
+# Bound types stored in transposition table entries
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Number of search nodes between checks of the clock during a timed search
+TIME_CHECK_INTERVAL = 256
+
+# Combined mobility of both players at or below which algo 4 splits the board into independent regions
+DECOMPOSITION_MOBILITY = 12
+
+# Move ordering priorities: the stored best move, then killer moves, then history scores
+HASH_MOVE_ORDER = 1 << 60
+KILLER_ORDER = 1 << 40
+
+# Score of a won position. A win found n plies from the root scores WIN_SCORE - n, so that a quicker win scores
+# higher and a slower loss scores higher. Scores beyond WIN_THRESHOLD are wins and losses, and MAX_SCORE bounds the
+# full search window.
+WIN_SCORE = 1000000
+WIN_THRESHOLD = WIN_SCORE - 1000
+MAX_SCORE = WIN_SCORE + 1
+
+# Static evaluation of a position where the human has no moves. It outscores every other evaluation but stays below
+# WIN_THRESHOLD, since a leaf is not a proven win: only a player left without moves during the search scores as a loss.
+BLOCKED_SCORE = 100000
+
+# Half width of the aspiration window around the previous iteration's score in iterative deepening
+ASPIRATION_WINDOW = 8
+
+
+'''
+Raised inside a timed search when the time budget runs out.
+'''
+class SearchTimeout(Exception):
+    pass
+
+
+'''
+This function turns a score found curDepth plies from the root into the score stored in the transposition table.
+Win and loss scores are stored as the distance from the position itself rather than from the root, since the
+same position can be reached at different plies.
+'''
+def toTableScore(score, curDepth):
+    if (score > WIN_THRESHOLD):
+        return score + curDepth
+    if (score < -WIN_THRESHOLD):
+        return score - curDepth
+    return score
+
+
+'''
+This function turns a stored transposition table score back into a score curDepth plies from the root.
+'''
+def fromTableScore(score, curDepth):
+    if (score > WIN_THRESHOLD):
+        return score - curDepth
+    if (score < -WIN_THRESHOLD):
+        return score + curDepth
+    return score
+
 
 class Game:
 
     '''
     Constructor
+    Accepts the number of transposition table entries (rounded up to a power of 2) and whether the table
+    keeps its entries from one bot move to the next. If a time budget in milliseconds is given, alpha beta
+    search deepens iteratively until the budget runs out instead of searching to boundDepth.
+    With more than one worker, fixed depth searches split the bot's moves across a pool of processes.
+    The board is boardSize x boardSize, from 6x6 to 16x16.
+    With the endgame solver, alpha beta search stops at positions the solver can decide, with an exact win or loss.
+    Solved positions are kept in the endgame table file at endgamePath, or only in memory if no path is given.
+    Algo 4 is alpha beta search that switches to combinatorial game decomposition once few moves are left.
+    With batchEvaluation, alpha beta search evaluates the leaves below each frontier node together with NumPy, if
+    it is installed. The endgame solver checks leaves one at a time, so it turns batch evaluation off.
+    With ponder, alpha beta search keeps searching in a background thread while the human thinks (see ponder).
+    With an opening book file at openingBookPath, alpha beta search plays the book move of a position if it has one.
+    Algo 5 is Monte Carlo tree search, which plays boundDepth random games per move, or as many as fit in the time
+    budget. With more than one worker, each worker process grows its own tree.
+    With a profilePath, every bot move's search statistics and timings are appended to <profilePath>.jsonl and
+    <profilePath>.folded (see searchProfiler.py).
     '''
-    def __init__(self, playerColor, botColor, algo, boundDepth):
+    def __init__(self, playerColor, botColor, algo, boundDepth, tableSize = 2**18, persistTable = True, timeBudget = None,
+                 numWorkers = 1, boardSize = BOARD_SIZE, useEndgameSolver = False, endgamePath = None, batchEvaluation = False,
+                 ponder = False, openingBookPath = None, profilePath = None):
         self.playerColor = playerColor
         self.botColor = botColor 
         self.algo = algo
         self.boundDepth = boundDepth
-        #self.staticEvaluationCount = 0
+        self.boardSize = boardSize
+        self.timeBudget = timeBudget
+        self.numWorkers = numWorkers
+        self.useEndgameSolver = useEndgameSolver
+        self.endgamePath = endgamePath
+        self.endgameSolver = EndgameSolver(EndgameTable(endgamePath, boardSize)) if (useEndgameSolver) else None
+        self.regionAnalyzer = RegionAnalyzer() if (algo == 4) else None
+        self.decomposedMove = False
+        self.batchEvaluation = batchEvaluation and NUMPY_AVAILABLE and not useEndgameSolver
+        self.monteCarlo = MonteCarloTreeSearch(botColor, playerColor, boardSize, numWorkers) if (algo == 5) else None
+
+        # Search profiler, or None when the search is not profiled
+        self.profiler = SearchProfiler(profilePath) if (profilePath is not None) else None
+
+        # Opening book, and whether the latest bot move came from it
+        self.openingBook = OpeningBook(openingBookPath, boardSize) if (openingBookPath is not None) else None
+        self.bookMove = None
+
+        # Pondering thread and the bot's replies it found, keyed by the human's move, and the pondered reply the
+        # latest bot move played, if any
+        self.ponderEnabled = ponder and algo in (3, 4)
+        self.ponderThread = None
+        self.ponderReplies = {}
+        self.ponderHit = None
+
+        # Set from another thread to end a timed or pondering search early, as if its time ran out
+        self.searchStop = False
+
+        # Process pool for parallel root search, created on first use
+        self.rootPool = None
+        self.sharedAlpha = None
+        self.rootSearchId = 0
+
+        # Depth and deadline of the alpha beta search in progress
+        self.searchDepth = boundDepth
+        self.deadline = None
+        self.searchNodes = 0
+        self.reachedDepthBound = False
+        self.completedDepth = 0
+        self.principalVariation = []
+        self.principalScore = 0
+
+        # Move ordering: killer moves per ply, and a history score per color keyed by start and end square.
+        # History scores are kept in dicts holding only the moves that caused cutoffs, since a table of every start
+        # and end square pair has boardSize**4 entries and aging all of them would cost more than a small search.
+        self.killerMoves = []
+        self.historyTable = {'X': {}, 'O': {}}
+        self.resetSearchStats()
+
+        # Transposition table for alpha beta search, indexed by the low bits of the position hash
+        self.tableSize = tableSize
+        self.tableMask = (1 << (tableSize - 1).bit_length()) - 1
+        self.persistTable = persistTable
+        self.clearTranspositionTable()
+
+
+    '''
+    This function empties the transposition table and resets its hit and miss counters.
+    '''
+    def clearTranspositionTable(self):
+        self.transpositionTable = [None] * (self.tableMask + 1)
+        self.tableGeneration = 0
+        self.tableHits = 0
+        self.tableMisses = 0
+
+
+    '''
+    This function looks up a position in the transposition table.
+    Accepts the position hash. Returns the entry (hash, depth, score, bound type, best move, generation) or None.
+    '''
+    def probeTranspositionTable(self, hashKey):
+        entry = self.transpositionTable[hashKey & self.tableMask]
+        if (entry is not None and entry[0] == hashKey):
+            self.tableHits = self.tableHits + 1
+            return entry
+        self.tableMisses = self.tableMisses + 1
+        return None
+
+
+    '''
+    This function stores a search result in the transposition table.
+    An entry from an earlier bot move is always replaced. Within a move, an entry is only replaced by a search
+    of the same position or one that is at least as deep, so the table keeps the most expensive results.
+    '''
+    def storeTranspositionTable(self, hashKey, depth, score, boundType, bestAction):
+        index = hashKey & self.tableMask
+        entry = self.transpositionTable[index]
+        if (entry is None or entry[5] != self.tableGeneration or entry[0] == hashKey or depth >= entry[1]):
+            self.transpositionTable[index] = (hashKey, depth, score, boundType, bestAction, self.tableGeneration)
+
+
+    '''
+    This function returns the transposition table hit and miss counts and the hit rate.
+    '''
+    def getTranspositionStats(self):
+        probes = self.tableHits + self.tableMisses
+        hitRate = self.tableHits / probes if probes > 0 else 0.0
+        return {'hits': self.tableHits, 'misses': self.tableMisses, 'hitRate': hitRate}
+
+
+    '''
+    This function resets the node, evaluation, solved node, cutoff and re-search counters of the search.
+    '''
+    def resetSearchStats(self):
+        self.searchNodes = 0
+        self.staticEvaluationCount = 0
+        self.solvedNodes = 0
+        self.cutoffs = 0
+        self.firstMoveCutoffs = 0
+        self.nullWindowResearches = 0
+        self.aspirationResearches = 0
+
+
+    '''
+    This function returns the node, static evaluation, solved node and cutoff counts of the latest bot move, and the
+    fraction of cutoffs that happened on the first move searched. Good move ordering keeps that fraction close to 1.
+    Also returns how many null window searches had to be searched again with the full window, and how many
+    iterations of iterative deepening fell outside their aspiration window.
+    '''
+    def getSearchStats(self):
+        firstMoveCutoffRate = self.firstMoveCutoffs / self.cutoffs if self.cutoffs > 0 else 0.0
+        return {'nodes': self.searchNodes, 'evaluations': self.staticEvaluationCount, 'solvedNodes': self.solvedNodes,
+                'cutoffs': self.cutoffs, 'firstMoveCutoffs': self.firstMoveCutoffs, 'firstMoveCutoffRate': firstMoveCutoffRate,
+                'nullWindowResearches': self.nullWindowResearches, 'aspirationResearches': self.aspirationResearches}
+
+
+    '''
+    This function asks the endgame solver for the exact value of a position, if it is small enough to solve.
+    Accepts the position, the color to move and the ply of the position. Returns a win score if the player to move
+    wins with perfect play, a loss score if it loses, or None if the position is not an endgame or the solver gave
+    up on it.
+    '''
+    def solveEndgame(self, gameState, curColor, opponentColor, curDepth):
+        if (not self.endgameSolver.isEndgame(gameState, curColor, opponentColor)):
+            return None
+        curWins = self.endgameSolver.solve(gameState, curColor, opponentColor)
+        if (curWins is None):
+            return None
+        self.solvedNodes = self.solvedNodes + 1
+        return WIN_SCORE - curDepth if (curWins) else -(WIN_SCORE - curDepth)
+
+
+    '''
+    Returns the history table index of an action, made from its start and end squares.
+    '''
+    def getHistoryIndex(self, action):
+        startSquare = action[0][0]*self.boardSize + action[0][1]
+        endSquare = action[-1][0]*self.boardSize + action[-1][1]
+        return startSquare*self.boardSize*self.boardSize + endSquare
+
+
+    '''
+    This function sorts actions so the ones most likely to cause a cutoff are searched first: the stored best move,
+    then the killer moves of this ply, then by history score. Ties keep the order of getLegalActions.
+    Multi-jump captures are not moved ahead of single jumps, because with this evaluation function they are rarely
+    the refuting move and searching them first more than doubled the node count.
+    Accepts legal actions, the color to move, the ply, and the stored best move (or None). Returns a new list.
+    '''
+    def orderMoves(self, allLegalActions, curColor, curDepth, hashAction):
+        killers = self.killerMoves[curDepth]
+        history = self.historyTable[curColor]
+        orderScores = []
+        for action in allLegalActions:
+            if (action == hashAction):
+                orderScore = HASH_MOVE_ORDER
+            else:
+                orderScore = history.get(self.getHistoryIndex(action), 0)
+                if (action == killers[0] or action == killers[1]):
+                    orderScore = orderScore + KILLER_ORDER
+            orderScores.append(orderScore)
+        order = sorted(range(len(allLegalActions)), key=orderScores.__getitem__, reverse=True)
+        return [allLegalActions[index] for index in order]
+
+
+    '''
+    This function records a beta cutoff: the move becomes a killer move at this ply and its history score grows
+    with the depth of the subtree it cut off.
+    '''
+    def recordCutoff(self, action, curColor, curDepth, remainingDepth, moveNumber):
+        self.cutoffs = self.cutoffs + 1
+        if (moveNumber == 0):
+            self.firstMoveCutoffs = self.firstMoveCutoffs + 1
+        if (self.profiler is not None):
+            self.profiler.countCutoff(curDepth, moveNumber)
+        killers = self.killerMoves[curDepth]
+        if (action != killers[0]):
+            killers[1] = killers[0]
+            killers[0] = action
+        history = self.historyTable[curColor]
+        historyIndex = self.getHistoryIndex(action)
+        history[historyIndex] = history.get(historyIndex, 0) + remainingDepth * remainingDepth
+
+
+    '''
+    This function clears the killer moves and ages the history scores before a new bot move is searched.
+    Accepts the position being searched, which bounds how many plies the search can reach.
+    '''
+    def prepareMoveOrdering(self, gameState):
+        maxPlies = max(bin(gameState.pieces['X'] | gameState.pieces['O']).count('1'), self.boundDepth) + 1
+        self.killerMoves = [[None, None] for ply in range(maxPlies)]
+        for color in self.historyTable:
+            history = self.historyTable[color]
+            self.historyTable[color] = {index: score >> 1 for index, score in history.items() if (score > 1)}
 
 
     '''
     This function parses commandline input and handles input errors. 
-    Accepts string input. Returns an action as a 2D array.
+    Accepts string input. Returns an action as a 2D array, which applyAction converts to the tuple form.
     '''
     def parseMoveInput(self, moveInput):
         allMoves = moveInput.split(' ')
@@ -30,7 +321,8 @@ class Game:
         if (len(allMoves) > 1):
             try:
                 for move in allMoves:
-                    coordinate = [int(move[1]), int(move[3])]
+                    row, col = move.strip('<>').split(',')
+                    coordinate = [int(row), int(col)]
                     action.append(coordinate)
                 return(action)
             except:
@@ -57,6 +349,45 @@ class Game:
         return None
 
 
+    '''
+    This function selects the bot's move, and profiles its search if a profiler is attached.
+    Accepts the gameboard, the bot's legal moves, and the (reply, depth) pondered for the human's last move, if any.
+    Returns the selected move.
+    '''
+    def selectAction(self, gameState, allLegalBotActions, ponderedReply = None):
+        if (self.profiler is None):
+            return self.selectActionByAlgo(gameState, allLegalBotActions, ponderedReply)
+        self.profiler.startMove()
+        action = self.selectActionByAlgo(gameState, allLegalBotActions, ponderedReply)
+        self.profiler.endMove(self, action)
+        return action
+
+
+    '''
+    This function selects the bot's move with the algorithm chosen by self.algo.
+    Accepts the gameboard, the bot's legal moves and the pondered reply, which alpha beta search may play (see
+    selectMiniMaxAB). Book moves and winning decompositions come first. Returns the selected move.
+    '''
+    def selectActionByAlgo(self, gameState, allLegalBotActions, ponderedReply = None):
+        self.resetSearchStats()
+        self.ponderHit = None
+        if (self.openingBook is not None and self.algo in (3, 4)):
+            self.bookMove = self.openingBook.lookup(gameState, self.botColor, allLegalBotActions)
+            if (self.bookMove is not None):
+                return self.bookMove[0]
+        if (self.algo == 1):
+            return self.selectRandom(allLegalBotActions)
+        elif (self.algo == 2):
+            return self.selectMiniMax(gameState, allLegalBotActions)
+        elif (self.algo == 4):
+            return self.selectDecomposition(gameState, allLegalBotActions, ponderedReply)
+        elif (self.algo == 5):
+            return self.selectMonteCarlo(gameState, allLegalBotActions)
+        else:
+            return self.selectMiniMaxAB(gameState, allLegalBotActions, -MAX_SCORE, MAX_SCORE, self.timeBudget,
+                                        ponderedReply = ponderedReply)
+
+
     '''
     This function is the simplest AI algorithm.
     Returns a randomly selected move from all of the possible moves.
@@ -70,12 +401,15 @@ class Game:
     Accepts current gameboard possible moves. Returns the best move based on the MiniMax algorithm.
     '''
     def selectMiniMax(self, gameState, allLegalActions):
+        self.resetSearchStats()
+        if (self.numWorkers > 1):
+            return self.searchRootParallel(gameState, allLegalActions, -MAX_SCORE, MAX_SCORE, False)
+        if (self.profiler is not None):
+            self.profiler.countNode(0)
         cbv = -math.inf
         bestAction = None
         for action in allLegalActions:
-            nextGameState = GameState(gameState)
-            nextGameState.applyAction(action, self.botColor, self.playerColor)
-            bv, prevAction = self.recurMiniMax(nextGameState, 1, self.playerColor, self.botColor, False, action)
+            bv = self.searchMiniMaxChild(gameState, 0, self.botColor, self.playerColor, False, action)
             if (bv > cbv):
                 cbv = bv
                 bestAction = action
@@ -87,21 +421,31 @@ class Game:
     Accepts details about recursive iteration. Returns the evaluated best value and best move of iteration.
     '''
     def recurMiniMax(self, curGameState, curDepth, curColor, opponentColor, isMax, prevAction):
+        self.searchNodes = self.searchNodes + 1
+        profiler = self.profiler
+        if (profiler is not None):
+            profiler.countNode(curDepth)
+
         # Base cases to end the recursion
         if (curDepth == self.boundDepth):
-            return self.evaluation(curGameState, prevAction), prevAction
-        allLegalActions = curGameState.getLegalActions(curColor, opponentColor)
+            if (profiler is None):
+                return self.evaluation(curGameState, prevAction), prevAction
+            return profiler.timed(EVALUATION, curDepth, self.evaluation)(curGameState, prevAction), prevAction
+        if (profiler is None):
+            allLegalActions = curGameState.getLegalActions(curColor, opponentColor)
+        else:
+            allLegalActions = profiler.timed(MOVE_GENERATION, curDepth, curGameState.getLegalActions)(curColor, opponentColor)
         if (len(allLegalActions) == 0):
-            return self.evaluation(curGameState, prevAction), prevAction
+            if (profiler is None):
+                return self.evaluation(curGameState, prevAction), prevAction
+            return profiler.timed(EVALUATION, curDepth, self.evaluation)(curGameState, prevAction), prevAction
 
         # If MAX state, looks for the action that maximizes the cbv
         if (isMax == True):
             cbv = -math.inf
             bestAction = None
             for action in allLegalActions:
-                nextGameState = GameState(curGameState)
-                nextGameState.applyAction(action, curColor, opponentColor)
-                bv, prevAction = self.recurMiniMax(nextGameState, curDepth+1, opponentColor, curColor, False, action)
+                bv = self.searchMiniMaxChild(curGameState, curDepth, curColor, opponentColor, False, action)
                 if (bv > cbv):
                     cbv = bv
                     bestAction = action
@@ -112,9 +456,7 @@ class Game:
             cbv = math.inf
             bestAction = None
             for action in allLegalActions:
-                nextGameState = GameState(curGameState)
-                nextGameState.applyAction(action, curColor, opponentColor)
-                bv, prevAction = self.recurMiniMax(nextGameState, curDepth+1, opponentColor, curColor, True, action)
+                bv = self.searchMiniMaxChild(curGameState, curDepth, curColor, opponentColor, True, action)
                 if (bv < cbv):
                     cbv = bv
                     bestAction = action
@@ -122,77 +464,603 @@ class Game:
 
 
     '''
-    This function begins the MiniMax AI algorithm using alpha beta prunning. It calls upon recurMiniMaxAB for recursion.
-    Accepts current gameboard possible moves. Returns the best move based on algorithm.
+    This function makes a move, searches the position it leads to with MiniMax and takes the move back, timing
+    each step when a profiler is attached.
+    Accepts the position, the ply and colors of the node, whether the next node is a MAX state, and the move.
+    Returns the value of the position the move leads to.
     '''
-    def selectMiniMaxAB(self, gameState, allLegalActions, alpha, beta):
-        bestAction = None
-        for action in allLegalActions:
-            nextGameState = GameState(gameState)
-            nextGameState.applyAction(action, self.botColor, self.playerColor)
-            bv, prevAction = self.recurMiniMaxAB(nextGameState, 1, self.playerColor, self.botColor, False, action, alpha, beta)
-            if (bv > alpha):
-                alpha = bv
+    def searchMiniMaxChild(self, curGameState, curDepth, curColor, opponentColor, isMax, action):
+        profiler = self.profiler
+        if (profiler is None):
+            undoRecord = curGameState.makeMove(action, curColor, opponentColor)
+            bv = self.recurMiniMax(curGameState, curDepth+1, opponentColor, curColor, isMax, action)[0]
+            curGameState.unmakeMove(undoRecord)
+            return bv
+        undoRecord = profiler.timed(MAKE_MOVE, curDepth, curGameState.makeMove)(action, curColor, opponentColor)
+        bv = profiler.timed(SUBTREE, curDepth+1, self.recurMiniMax)(curGameState, curDepth+1, opponentColor, curColor, isMax, action)[0]
+        profiler.timed(MAKE_MOVE, curDepth, curGameState.unmakeMove)(undoRecord)
+        return bv
+
+
+    '''
+    This function plays late positions with combinatorial game theory. Once few moves are left, the board is split
+    into regions that can never interact, and the sum of the region values shows whether a move wins.
+    Positions that cannot be split within the region search budget, and lost positions, where every move loses
+    against perfect play, are left to alpha beta search, which picks the move that looks best.
+    Accepts the gameboard, the bot's legal moves and the pondered reply for alpha beta search. Returns the selected move.
+    '''
+    def selectDecomposition(self, gameState, allLegalActions, ponderedReply = None):
+        self.decomposedMove = False
+        if (gameState.mobility['X'] + gameState.mobility['O'] <= DECOMPOSITION_MOBILITY):
+            action = self.regionAnalyzer.selectWinningAction(gameState, self.botColor, self.playerColor, allLegalActions)
+            if (action is not None):
+                self.decomposedMove = True
+                return action
+        return self.selectMiniMaxAB(gameState, allLegalActions, -MAX_SCORE, MAX_SCORE, self.timeBudget,
+                                    ponderedReply = ponderedReply)
+
+
+    '''
+    This function plays the move Monte Carlo tree search tried the most, over boundDepth random games or the time
+    budget. The number of random games is counted as the nodes searched.
+    Accepts the gameboard and the bot's legal moves. Returns the selected move.
+    '''
+    def selectMonteCarlo(self, gameState, allLegalActions):
+        action = self.monteCarlo.selectAction(gameState, allLegalActions, self.boundDepth, self.timeBudget)
+        self.searchNodes = self.monteCarlo.playouts
+        return action
+
+
+    '''
+    This function begins the MiniMax AI algorithm using alpha beta prunning. It calls upon recurPrincipalVariation for recursion.
+    Accepts current gameboard possible moves, and optionally a time budget in milliseconds or a depth limit for
+    iterative deepening. Returns the best move based on algorithm.
+    A reply pondered for this position, given as (reply, depth), is played without a search if it was searched at
+    least as deep as a fixed depth search would go. Otherwise the search runs, and with iterative deepening the
+    pondered reply is still played if it was searched deeper than the search got. ponderHit says which happened.
+    '''
+    def selectMiniMaxAB(self, gameState, allLegalActions, alpha, beta, timeBudget = None, depthLimit = None, ponderedReply = None):
+        # Each bot move starts a new table generation, so entries from earlier moves can be replaced first
+        if (self.persistTable):
+            self.tableGeneration = self.tableGeneration + 1
+        else:
+            self.clearTranspositionTable()
+        self.resetSearchStats()
+        self.ponderHit = None
+        fixedDepth = self.boundDepth if (depthLimit is None) else depthLimit
+        if (ponderedReply is not None and timeBudget is None and ponderedReply[1] >= fixedDepth):
+            self.ponderHit = ponderedReply
+            return ponderedReply[0]
+        self.prepareMoveOrdering(gameState)
+        allLegalActions = self.orderMoves(allLegalActions, self.botColor, 0, None)
+
+        if (timeBudget is not None or depthLimit is not None):
+            bestAction = self.iterativeDeepeningAB(gameState, allLegalActions, alpha, beta, timeBudget, depthLimit)
+            if (ponderedReply is not None and ponderedReply[1] > self.completedDepth):
+                self.ponderHit = ponderedReply
+                bestAction = ponderedReply[0]
+            return bestAction
+
+        self.searchDepth = self.boundDepth
+        self.deadline = None
+        if (self.numWorkers > 1 and beta == MAX_SCORE):
+            bestAction = self.searchRootParallel(gameState, allLegalActions, alpha, beta, True)
+        else:
+            bestAction, bv = self.searchRootAB(gameState, allLegalActions, alpha, beta)
+
+        # When no move beats the alpha it was given, there is no best move, so play the first one
+        if (bestAction is None and len(allLegalActions) > 0):
+            bestAction = allLegalActions[0]
+        return bestAction
+
+
+    '''
+    This function returns the process pool for parallel root search, starting it on first use.
+    Every worker process keeps its own Game, with its own transposition table, for the life of the pool.
+    '''
+    def getRootPool(self):
+        if (self.rootPool is None):
+            self.sharedAlpha = multiprocessing.Value('q', -MAX_SCORE)
+            gameSettings = (self.playerColor, self.botColor, self.algo, self.tableSize, self.boardSize, self.useEndgameSolver,
+                            self.endgamePath, self.batchEvaluation)
+            self.rootPool = concurrent.futures.ProcessPoolExecutor(max_workers=self.numWorkers, initializer=initRootWorker,
+                                                                   initargs=(gameSettings, self.sharedAlpha))
+        return self.rootPool
+
+
+    '''
+    This function shuts down the parallel root search and Monte Carlo workers, if they were started.
+    '''
+    def closeWorkers(self):
+        if (self.rootPool is not None):
+            self.rootPool.shutdown()
+            self.rootPool = None
+            self.sharedAlpha = None
+        if (self.monteCarlo is not None):
+            self.monteCarlo.closeWorkers()
+
+
+    '''
+    This function releases everything the Game holds open: the worker pools, the endgame table file and the
+    opening book file. The Game cannot search after it is closed.
+    '''
+    def close(self):
+        self.closeWorkers()
+        if (self.endgameSolver is not None):
+            self.endgameSolver.table.close()
+        if (self.openingBook is not None):
+            self.openingBook.close()
+
+
+    '''
+    This function searches the bot's moves in parallel, one root move per task, to boundDepth.
+    With alpha beta prunning, workers start from the best value any worker has found so far, lowered by one so
+    that a move tying it still gets its exact value. Accepts the root window, where beta must be infinite.
+    Returns the same move as the serial search: the first move, in the given order, with the highest value.
+    '''
+    def searchRootParallel(self, gameState, allLegalActions, alpha, beta, useAlphaBeta):
+        pool = self.getRootPool()
+        self.sharedAlpha.value = alpha
+        self.rootSearchId = self.rootSearchId + 1
+        futures = [pool.submit(searchRootChild, self.rootSearchId, gameState, action, self.boundDepth, alpha, beta, useAlphaBeta)
+                   for action in allLegalActions]
+        results = [future.result() for future in futures]
+        self.searchNodes = self.searchNodes + sum(nodes for bv, childAlpha, nodes in results)
+
+        # A child's value is exact when it beat the alpha it was searched with, otherwise it is only an upper bound
+        exactValues = [bv for bv, childAlpha, nodes in results if bv > childAlpha]
+        if (len(exactValues) == 0):
+            return None
+        bestValue = max(exactValues)
+        for index in range(len(allLegalActions)):
+            bv, childAlpha, nodes = results[index]
+            if (bv <= childAlpha and childAlpha >= bestValue):
+                # The bound cannot rule out a tie with the best value, so search this child again with the full window
+                action = allLegalActions[index]
+                bv = self.searchChild(gameState, 0, self.botColor, self.playerColor, action, 0, alpha, beta)
+                childAlpha = alpha
+            if (bv > childAlpha and bv == bestValue):
+                return allLegalActions[index]
+        return None
+
+
+    '''
+    This function searches depth 1, 2, 3, ... with alpha beta prunning until the time budget (milliseconds) runs out,
+    the depth limit is reached or searchStop is set. Without a time budget only the depth limit and searchStop end
+    the search. Each iteration searches the previous iteration's best move first, and the transposition table
+    orders the rest of the principal variation. Returns the best move of the deepest iteration that finished, and
+    keeps its score in principalScore.
+    Each iteration after the first searches an aspiration window around the previous iteration's score, since the
+    score rarely moves far from one depth to the next. If the score falls outside the window, the side it fell
+    out of is moved past the score the search returned, four times further each time, and the iteration is searched
+    again until the score lands inside the window.
+    '''
+    def iterativeDeepeningAB(self, gameState, allLegalActions, alpha, beta, timeBudget, depthLimit = None):
+        self.deadline = time.perf_counter() + timeBudget / 1000.0 if (timeBudget is not None) else math.inf
+        self.completedDepth = 0
+        self.principalVariation = []
+        self.principalScore = 0
+
+        # An unfinished iteration leaves moves made on the board, so search a copy
+        if (self.profiler is None):
+            searchState = GameState(gameState)
+        else:
+            searchState = self.profiler.timed(COPY, 0, GameState)(gameState)
+        rootActions = list(allLegalActions)
+        bestAction = rootActions[0] if (len(rootActions) > 0) else None
+
+        # Every move captures at least one piece, so no game lasts more plies than there are pieces left
+        maxDepth = bin(gameState.pieces['X'] | gameState.pieces['O']).count('1')
+        if (depthLimit is not None):
+            maxDepth = min(maxDepth, depthLimit)
+
+        depth = 1
+        prevScore = None
+        while (depth <= maxDepth):
+            self.searchDepth = depth
+            self.reachedDepthBound = False
+            windowSize = ASPIRATION_WINDOW
+            if (prevScore is None or abs(prevScore) > WIN_THRESHOLD):
+                windowAlpha, windowBeta = alpha, beta
+            else:
+                windowAlpha, windowBeta = max(prevScore - windowSize, alpha), min(prevScore + windowSize, beta)
+            try:
+                while (True):
+                    action, bv = self.searchRootAB(searchState, rootActions, windowAlpha, windowBeta)
+                    windowSize = windowSize * 4
+                    if (bv <= windowAlpha and windowAlpha > alpha):
+                        windowAlpha = max(bv - windowSize, alpha)
+                    elif (bv >= windowBeta and windowBeta < beta):
+                        windowBeta = min(bv + windowSize, beta)
+                    else:
+                        break
+                    self.aspirationResearches = self.aspirationResearches + 1
+            except SearchTimeout:
+                break
+            prevScore = bv
+            self.completedDepth = depth
+            self.principalScore = bv
+            if (action is not None):
                 bestAction = action
-            if (alpha >= beta):
-                return bestAction
+                rootActions.remove(action)
+                rootActions.insert(0, action)
+                self.principalVariation = self.getPrincipalVariation(searchState, action)
+
+            # Stop once a search ends every line before the depth bound, because deeper searches cannot differ
+            if (not self.reachedDepthBound or time.perf_counter() > self.deadline):
+                break
+            depth = depth + 1
+
+        self.deadline = None
         return bestAction
 
 
     '''
-    This is the recursive function for MiniMax algorithm using alpha beta prunning.
-    Accepts details about recursive iteration. Returns the evaluated best value and best move of iteration.
+    This function searches each of the bot's moves at the root with principal variation search.
+    Returns the best move and its value, or no move and an upper bound on the value if none beats alpha.
+    '''
+    def searchRootAB(self, gameState, allLegalActions, alpha, beta):
+        self.searchNodes = self.searchNodes + 1
+        if (self.profiler is not None):
+            self.profiler.countNode(0)
+        bestScore = -MAX_SCORE
+        bestAction = None
+        for moveNumber, action in enumerate(allLegalActions):
+            bv = self.searchChild(gameState, 0, self.botColor, self.playerColor, action, moveNumber, alpha, beta)
+            if (bv > bestScore):
+                bestScore = bv
+                if (bv > alpha):
+                    alpha = bv
+                    bestAction = action
+            if (alpha >= beta):
+                self.recordCutoff(action, self.botColor, 0, self.searchDepth, moveNumber)
+                return bestAction, bestScore
+        return bestAction, bestScore
+
+
+    '''
+    This function makes a move, searches the position it leads to and takes the move back.
+    The first move of a node is searched with the full window. Every later move is first searched with a null window
+    just above alpha, which only shows whether it beats alpha, and is searched again with the full window if it does.
+    With good move ordering the first move is usually best, so most moves are only searched with the cheaper null window.
+    Accepts the position, the ply and colors of the node, the move and its place in the move order, and the window.
+    Returns the score of the move for the player who makes it.
+    '''
+    def searchChild(self, curGameState, curDepth, curColor, opponentColor, action, moveNumber, alpha, beta):
+        # Without a profiler, methods are called directly, so the search does not slow down
+        profiler = self.profiler
+        if (profiler is None):
+            undoRecord = curGameState.makeMove(action, curColor, opponentColor)
+            searchNode = self.recurPrincipalVariation
+        else:
+            undoRecord = profiler.timed(MAKE_MOVE, curDepth, curGameState.makeMove)(action, curColor, opponentColor)
+            searchNode = profiler.timed(SUBTREE, curDepth+1, self.recurPrincipalVariation)
+
+        if (moveNumber == 0):
+            bv = -searchNode(curGameState, curDepth+1, opponentColor, curColor, action, -beta, -alpha)[0]
+        else:
+            bv = -searchNode(curGameState, curDepth+1, opponentColor, curColor, action, -alpha-1, -alpha)[0]
+            if (alpha < bv < beta):
+                self.nullWindowResearches = self.nullWindowResearches + 1
+                bv = -searchNode(curGameState, curDepth+1, opponentColor, curColor, action, -beta, -alpha)[0]
+        if (profiler is None):
+            curGameState.unmakeMove(undoRecord)
+        else:
+            profiler.timed(MAKE_MOVE, curDepth, curGameState.unmakeMove)(undoRecord)
+        return bv
+
+
     '''
-    def recurMiniMaxAB(self, curGameState, curDepth, curColor, opponentColor, isMax, prevAction, alpha, beta):
+    This function follows the best moves stored in the transposition table from the given root move.
+    Returns the principal variation as a list of actions, starting with the root move.
+    '''
+    def getPrincipalVariation(self, gameState, rootAction):
+        principalVariation = [rootAction]
+        undoRecords = [gameState.makeMove(rootAction, self.botColor, self.playerColor)]
+        curColor, opponentColor = self.playerColor, self.botColor
+        while (len(principalVariation) < self.searchDepth):
+            hashKey = gameState.getHashKey(curColor)
+            entry = self.transpositionTable[hashKey & self.tableMask]
+            if (entry is None or entry[0] != hashKey or entry[4] is None):
+                break
+            # Guard against hash collisions before making the stored move
+            if (entry[4] not in gameState.getLegalActions(curColor, opponentColor)):
+                break
+            principalVariation.append(entry[4])
+            undoRecords.append(gameState.makeMove(entry[4], curColor, opponentColor))
+            curColor, opponentColor = opponentColor, curColor
+        for undoRecord in reversed(undoRecords):
+            gameState.unmakeMove(undoRecord)
+        return principalVariation
+
+
+    '''
+    This is the recursive function for MiniMax algorithm using alpha beta prunning, written as negamax principal
+    variation search: scores are from the point of view of the player to move, so a child's score is negated, and
+    every move after the first is searched with a null window (see searchChild).
+    Accepts details about recursive iteration. Returns the score and best move of iteration. A score at or below
+    alpha is only an upper bound on the true score, and one at or above beta only a lower bound, but both are as
+    tight as the search found (fail-soft), which narrows the stored bounds and the aspiration re-searches.
+    A player with no move left loses. Results of interior nodes are kept in the transposition table. Leaves are
+    not, because their evaluation depends on the move that reached them.
+    '''
+    def recurPrincipalVariation(self, curGameState, curDepth, curColor, opponentColor, prevAction, alpha, beta):
+        # A timed search checks the clock every few nodes
+        self.searchNodes = self.searchNodes + 1
+        profiler = self.profiler
+        if (profiler is not None):
+            profiler.countNode(curDepth)
+        if (self.deadline is not None and self.searchNodes % TIME_CHECK_INTERVAL == 0):
+            if (time.perf_counter() > self.deadline or self.searchStop):
+                raise SearchTimeout()
+
+        # Solved endgame positions end the search with an exact win or loss
+        if (self.endgameSolver is not None):
+            solvedScore = self.solveEndgame(curGameState, curColor, opponentColor, curDepth)
+            if (solvedScore is not None):
+                return solvedScore, prevAction
+
         # Base cases to end the recursion
-        if (curDepth == self.boundDepth):
-            return self.evaluation(curGameState, prevAction), prevAction
-        allLegalActions = curGameState.getLegalActions(curColor, opponentColor)
+        if (curDepth == self.searchDepth):
+            self.reachedDepthBound = True
+            if (profiler is None):
+                botScore = self.evaluation(curGameState, prevAction)
+            else:
+                botScore = profiler.timed(EVALUATION, curDepth, self.evaluation)(curGameState, prevAction)
+            return self.getLeafScore(botScore, curColor), prevAction
+
+        # Reuse a stored result that was searched at least as deep and fits the current window
+        remainingDepth = self.searchDepth - curDepth
+        hashKey = curGameState.getHashKey(curColor)
+        entry = self.probeTranspositionTable(hashKey)
+        if (entry is not None and entry[1] >= remainingDepth):
+            # The stored search may have been cut off by a depth bound, so the next iteration could differ
+            self.reachedDepthBound = True
+            score, boundType = fromTableScore(entry[2], curDepth), entry[3]
+            if (boundType == EXACT):
+                return score, entry[4]
+            if (boundType == LOWER_BOUND and score >= beta):
+                return score, entry[4]
+            if (boundType == UPPER_BOUND and score <= alpha):
+                return score, entry[4]
+
+        if (profiler is None):
+            allLegalActions = curGameState.getLegalActions(curColor, opponentColor)
+        else:
+            allLegalActions = profiler.timed(MOVE_GENERATION, curDepth, curGameState.getLegalActions)(curColor, opponentColor)
         if (len(allLegalActions) == 0):
-            return self.evaluation(curGameState, prevAction), prevAction
+            return -(WIN_SCORE - curDepth), prevAction
 
-        # If MAX state, looks for the action that maximizes the alpha
-        if (isMax == True):
-            bestAction = None
-            for action in allLegalActions:
-                nextGameState = GameState(curGameState)
-                nextGameState.applyAction(action, curColor, opponentColor)
-                bv, prevAction = self.recurMiniMaxAB(nextGameState, curDepth+1, opponentColor, curColor, False, action, alpha, beta)
+        # The stored best move comes first, which follows the principal variation of the previous iteration
+        hashAction = entry[4] if (entry is not None) else None
+        allLegalActions = self.orderMoves(allLegalActions, curColor, curDepth, hashAction)
+
+        # At the frontier every child is a leaf, and with batch evaluation they are all evaluated up front.
+        # The loop below then cuts off exactly where it would have, so the result is the same.
+        leafScores = None
+        if (self.batchEvaluation and curDepth == self.searchDepth - 1):
+            evaluateFrontier = self.evaluateFrontier
+            if (profiler is not None):
+                evaluateFrontier = profiler.timed(EVALUATION, curDepth, evaluateFrontier)
+            leafScores = [self.getLeafScore(score, curColor)
+                          for score in evaluateFrontier(curGameState, curColor, opponentColor, allLegalActions)]
+
+        # Looks for the action that maximizes the score
+        origAlpha = alpha
+        bestScore = -MAX_SCORE
+        bestAction = None
+        for moveNumber, action in enumerate(allLegalActions):
+            if (leafScores is not None):
+                bv = leafScores[moveNumber]
+            else:
+                bv = self.searchChild(curGameState, curDepth, curColor, opponentColor, action, moveNumber, alpha, beta)
+            if (bv > bestScore):
+                bestScore = bv
                 if (bv > alpha):
                     alpha = bv
                     bestAction = action
-                if (alpha >= beta):
-                    return beta, bestAction
-            return alpha, bestAction
-        
-        # If MAX state, looks for the action that minimizes the beta
-        else:
-            bestAction = None
-            for action in allLegalActions:
-                nextGameState = GameState(curGameState)
-                nextGameState.applyAction(action, curColor, opponentColor)
-                bv, prevAction = self.recurMiniMaxAB(nextGameState, curDepth+1, opponentColor, curColor, True, action, alpha, beta)
-                if (bv < beta):
-                    beta = bv
-                    bestAction = action
-                if (beta <= alpha):
-                    return alpha, bestAction
-            return beta, bestAction
+            if (alpha >= beta):
+                self.recordCutoff(action, curColor, curDepth, remainingDepth, moveNumber)
+                self.storeTranspositionTable(hashKey, remainingDepth, toTableScore(bestScore, curDepth), LOWER_BOUND, bestAction)
+                return bestScore, bestAction
+        boundType = EXACT if alpha > origAlpha else UPPER_BOUND
+        self.storeTranspositionTable(hashKey, remainingDepth, toTableScore(bestScore, curDepth), boundType, bestAction)
+        return bestScore, bestAction
+
+
+    '''
+    This function turns a static evaluation, which scores a position for the bot, into a score for the player to
+    move.
+    '''
+    def getLeafScore(self, botScore, curColor):
+        return botScore if (curColor == self.botColor) else -botScore
+
+
+    '''
+    This function starts pondering the position the human is about to move in, in a background thread.
+    The thread searches a copy of the position, and the main thread does not search until stopPondering returns,
+    so the two never use the search state at the same time. input() releases the interpreter lock, so the thread
+    runs at full speed while the human thinks.
+    '''
+    def startPondering(self, gameState):
+        self.searchStop = False
+        self.ponderReplies = {}
+        self.ponderThread = threading.Thread(target=self.ponder, args=(GameState(gameState),), daemon=True)
+        self.ponderThread.start()
+
+
+    '''
+    This function stops the pondering thread and waits for it to finish its current node.
+    Accepts the move the human made. Returns the pondered (reply, depth) for that move, or None.
+    '''
+    def stopPondering(self, playerAction):
+        if (self.ponderThread is None):
+            return None
+        self.searchStop = True
+        self.ponderThread.join()
+        self.ponderThread = None
+        self.searchStop = False
+        return self.ponderReplies.get(toAction(playerAction))
+
+
+    '''
+    This function searches the bot's replies to the human's moves until it is stopped.
+    The move the last search expects the human to make, its stored best move for this position, is pondered first
+    to the search depth: boundDepth, or with a time budget one ply deeper than the last bot move reached. Then the
+    replies to every human move are deepened in turn, one ply at a time, so the most likely moves are covered first.
+    Each finished search keeps its reply in ponderReplies, and its positions stay in the transposition table,
+    which the bot's own search then reuses.
+    '''
+    def ponder(self, gameState):
+        if (self.persistTable):
+            self.tableGeneration = self.tableGeneration + 1
+        self.resetSearchStats()
+        self.prepareMoveOrdering(gameState)
+        self.deadline = math.inf
+
+        allLegalPlayerActions = gameState.getLegalActions(self.playerColor, self.botColor)
+        entry = self.probeTranspositionTable(gameState.getHashKey(self.playerColor))
+        if (entry is not None and entry[4] in allLegalPlayerActions):
+            allLegalPlayerActions.remove(entry[4])
+            allLegalPlayerActions.insert(0, entry[4])
+        ponderDepth = self.boundDepth if (self.timeBudget is None) else max(self.completedDepth, 1) + 1
+        maxDepth = self.boundDepth if (self.timeBudget is None) else bin(gameState.pieces['X'] | gameState.pieces['O']).count('1')
+
+        replyOrders = {}
+        try:
+            for depth in range(1, ponderDepth + 1):
+                self.ponderReply(gameState, allLegalPlayerActions[0], depth, replyOrders)
+            for depth in range(1, maxDepth + 1):
+                for playerAction in allLegalPlayerActions:
+                    if (depth > ponderDepth or playerAction != allLegalPlayerActions[0]):
+                        self.ponderReply(gameState, playerAction, depth, replyOrders)
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+
+
+    '''
+    This function searches the bot's replies to one human move to the given depth.
+    The best reply of the previous depth is searched first, as in iterative deepening.
+    '''
+    def ponderReply(self, gameState, playerAction, depth, replyOrders):
+        undoRecord = gameState.makeMove(playerAction, self.playerColor, self.botColor)
+        replies = replyOrders.get(playerAction)
+        if (replies is None):
+            replies = gameState.getLegalActions(self.botColor, self.playerColor)
+            replyOrders[playerAction] = replies
+        if (len(replies) > 0):
+            self.searchDepth = depth
+            reply, bv = self.searchRootAB(gameState, replies, -MAX_SCORE, MAX_SCORE)
+            if (reply is None):
+                reply = replies[0]
+            replies.remove(reply)
+            replies.insert(0, reply)
+            self.ponderReplies[playerAction] = (reply, depth)
+        gameState.unmakeMove(undoRecord)
 
 
     '''
     This function evaluates how good an action is using static evaluation fuction.
     Accepts gameboard, action, and player info. Returns integer score for action.
+    Mobility and multi-jump counts are read from the counts GameState keeps up to date as moves are made,
+    instead of generating both players' legal moves.
     '''
     def evaluation(self, curGameState, prevAction):
         score = 0
-        #self.staticEvaluationCount = self.staticEvaluationCount + 1
+        self.staticEvaluationCount = self.staticEvaluationCount + 1
         #print("static eval HERE: ", self.staticEvaluationCount)
 
         # Adds value to moves that are made up more than 1 jump
         jumps = len(prevAction)
         score = score + (jumps-2)*2
 
+        # Adds value to moves that have the potential for more options next time
+        score = score + curGameState.mobility[self.botColor]
+
+        # Adds value to the move that causes opponent to have no further moves
+        if (curGameState.mobility[self.playerColor] == 0):
+            score = BLOCKED_SCORE
+        # Subtracts value from the move that causes opponent to have moves with more than 1 jump
+        else:
+            score = score - curGameState.multiJumps[self.playerColor]*2
+
+        # Devalues the moves that are in the corners
+        lastIndex = self.boardSize - 1
+        if (prevAction[0][0] == 0 and prevAction[0][1] == 0) or (prevAction[0][0] == lastIndex and prevAction[0][1] == lastIndex) or (prevAction[0][0] == 0 and prevAction[0][1] == lastIndex) or (prevAction[0][0] == lastIndex and prevAction[0][1] == 0):
+            score = 1   
+
+        return score
+
+
+    '''
+    This function evaluates every child of a frontier node at once.
+    Child boards are made from the move tables without makeMove, since leaves need no hash or move counts of their
+    own, and each child counts as a search node as it would in recurPrincipalVariation.
+    Accepts the frontier position, the color to move and its ordered legal actions. Returns the child scores.
+    '''
+    def evaluateFrontier(self, curGameState, curColor, opponentColor, allLegalActions):
+        moveEffects = curGameState.tables.moveEffects
+        curPieces, opponentPieces = curGameState.pieces[curColor], curGameState.pieces[opponentColor]
+        curBoards = []
+        opponentBoards = []
+        for action in allLegalActions:
+            self.searchNodes = self.searchNodes + 1
+            if (self.deadline is not None and self.searchNodes % TIME_CHECK_INTERVAL == 0):
+                if (time.perf_counter() > self.deadline or self.searchStop):
+                    raise SearchTimeout()
+            startSquare, endSquare, capturedPieces = moveEffects[action][:3]
+            curBoards.append(curPieces ^ (1 << startSquare) ^ (1 << endSquare))
+            opponentBoards.append(opponentPieces ^ capturedPieces)
+        self.reachedDepthBound = True
+        if (self.profiler is not None):
+            self.profiler.countNode(self.searchDepth, len(allLegalActions))
+
+        if (curColor == 'X'):
+            return self.evaluationBatch(curBoards, opponentBoards, allLegalActions)
+        return self.evaluationBatch(opponentBoards, curBoards, allLegalActions)
+
+
+    '''
+    This function is the batched static evaluation. It returns the same scores as evaluation, with the move counts
+    of all the positions found together by countMovesBatch.
+    Accepts the dark and light bitboards of the positions and the action that reached each one.
+    Returns the list of scores.
+    '''
+    def evaluationBatch(self, darkBoards, lightBoards, prevActions):
+        self.staticEvaluationCount = self.staticEvaluationCount + len(prevActions)
+        mobility, multiJumps = countMovesBatch(darkBoards, lightBoards, self.boardSize)
+        botMobility = mobility[self.botColor].tolist()
+        playerMobility = mobility[self.playerColor].tolist()
+        playerJumps = multiJumps[self.playerColor].tolist()
+
+        lastIndex = self.boardSize - 1
+        corners = ((0, 0), (lastIndex, lastIndex), (0, lastIndex), (lastIndex, 0))
+        scores = []
+        for index in range(len(prevActions)):
+            prevAction = prevActions[index]
+            if (prevAction[0] in corners):
+                score = 1
+            elif (playerMobility[index] == 0):
+                score = BLOCKED_SCORE
+            else:
+                score = (len(prevAction)-2)*2 + botMobility[index] - playerJumps[index]*2
+            scores.append(score)
+        return scores
+
+
+    '''
+    This function is the original static evaluation, which generates both players' legal moves.
+    It returns the same scores as evaluation and is kept as the reference that evaluation is checked against.
+    '''
+    def evaluationFromLegalActions(self, curGameState, prevAction):
+        score = 0
+
+        # Adds value to moves that are made up more than 1 jump
+        jumps = len(prevAction)
+        score = score + (jumps-2)*2
+
         # Adds value to moves that have the potential for more options next time
         allLegalCurActions = curGameState.getLegalActions(self.botColor, self.playerColor)
         score = score + len(allLegalCurActions)    
@@ -200,7 +1068,7 @@ class Game:
         allLegalOpponentActions = curGameState.getLegalActions(self.playerColor, self.botColor)
         # Adds value to the move that causes opponent to have no further moves
         if (len(allLegalOpponentActions) == 0):
-            score = math.inf
+            score = BLOCKED_SCORE
         # Subtracts value from the move that causes opponent to have moves with more than 1 jump
         else:
             for action in allLegalOpponentActions:
@@ -208,7 +1076,8 @@ class Game:
                     score = score - (len(action) - 2)*2
 
         # Devalues the moves that are in the corners
-        if (prevAction[0][0] == 0 and prevAction[0][1] == 0) or (prevAction[0][0] == 7 and prevAction[0][1] == 7) or (prevAction[0][0] == 0 and prevAction[0][1] == 7) or (prevAction[0][0] == 7 and prevAction[0][1] == 0):
+        lastIndex = self.boardSize - 1
+        if (prevAction[0][0] == 0 and prevAction[0][1] == 0) or (prevAction[0][0] == lastIndex and prevAction[0][1] == lastIndex) or (prevAction[0][0] == 0 and prevAction[0][1] == lastIndex) or (prevAction[0][0] == lastIndex and prevAction[0][1] == 0):
             score = 1   
 
         return score
@@ -222,22 +1091,23 @@ class Game:
         allPotentialMoves = 0
         allMadeMoves = 0
 
-        gameBoard = GameState()
+        gameBoard = GameState(boardSize = self.boardSize)
         print("\nStarting Board:", gameBoard.getPrintBoard())
 
-        # Starting move
-        startActionDark = [[3, 3], None]
+        # Starting move: dark removes the center piece and light removes the piece beside it
+        startActionDark, startActionLight = getOpeningRemovals(self.boardSize)
         gameBoard.applyAction(startActionDark, 'X', 'O')
-        startActionLight = [[3, 4], None]
         gameBoard.applyAction(startActionLight, 'O', 'X')
-        print("\nDark removes <4,4> \nLight removes <4,5>", gameBoard.getPrintBoard())
+        center = startActionDark[0][0] + 1
+        print("\nDark removes <" + str(center) + "," + str(center) + "> \nLight removes <" + str(center) + "," + str(center+1) + ">", gameBoard.getPrintBoard())
 
         # If human player is light, then the computer is dark and must go first.
         if (self.playerColor == 'O'):
             allLegalBotActions = gameBoard.getLegalActions(self.playerColor, self.botColor)
             print("bot actions: ", allLegalBotActions, len(allLegalBotActions))
-            firstBotMove = [[5,3], [3,3]]
-            gameBoard.applyAction(firstBotMove, 'X', 'O')
+            centerRow, centerCol = startActionDark[0]
+            firstBotMove = ((centerRow + 2, centerCol), (centerRow, centerCol))
+            gameBoard.makeMove(firstBotMove, 'X', 'O')
             self.printMove(self.botColor, firstBotMove, gameBoard)
             allPotentialMoves = allPotentialMoves + len(allLegalBotActions)
             allMadeMoves = allMadeMoves + 1
@@ -254,6 +1124,9 @@ class Game:
 
 
             
+            # The bot searches on the human's time until the human's move is entered
+            if (self.ponderEnabled and self.ponderThread is None):
+                self.startPondering(gameBoard)
             actionInput = input('\nFor the piece you would like to move, enter the current coordinate position and what position(s) you would like to move it to, as separated by spaces (e.g. "<6,4> <4,4>" or "<6,4> <4,4> <2,4>"): ')
             action = self.parseMoveInput(actionInput)
             if (action == None):
@@ -272,6 +1145,7 @@ class Game:
                 print("\nERROR: Selected move was not legal, please try different coordinates.")
                 continue
             self.printMove(self.playerColor, action, gameBoard)
+            ponderedReply = self.stopPondering(action)
             allPotentialMoves = allPotentialMoves + len(allLegalPlayerActions)
             allMadeMoves = allMadeMoves + 1
 
@@ -283,14 +1157,26 @@ class Game:
                 winner = self.playerColor
                 continue
 
-            if (self.algo == 1):
-                action = self.selectRandom(allLegalBotActions)
-            elif (self.algo == 2):
-                action = self.selectMiniMax(gameBoard, allLegalBotActions)
-            else:
-                action = self.selectMiniMaxAB(gameBoard, allLegalBotActions, -math.inf, math.inf)
+            action = self.selectAction(gameBoard, allLegalBotActions, ponderedReply)
+            if (self.ponderHit is not None):
+                print("Pondered reply, searched to depth ", self.ponderHit[1], " while you thought")
+            elif (self.openingBook is not None and self.bookMove is not None):
+                print("Book move, searched to depth ", self.bookMove[1], " when the book was built")
+            elif (self.algo == 4 and self.decomposedMove):
+                print("Winning move found by splitting the board into ", self.regionAnalyzer.lastRegionCount, " regions")
+            elif (self.algo in (3, 4)):
+                if (self.timeBudget is not None):
+                    print("Searched to depth ", self.completedDepth, " in ", self.timeBudget, " ms")
+                searchStats = self.getSearchStats()
+                print("Nodes searched: ", searchStats['nodes'], " first move cutoff rate: ", searchStats['firstMoveCutoffRate'])
+                if (self.endgameSolver is not None and searchStats['solvedNodes'] > 0):
+                    print("Solved endgame positions reached: ", searchStats['solvedNodes'])
+            elif (self.algo == 5):
+                print("Random games played: ", self.monteCarlo.playouts, " kept from the last move: ", self.monteCarlo.reusedVisits,
+                      " win rate of the chosen move: ", round(self.monteCarlo.bestWinRate, 3))
             
-            gameBoard.applyAction(action, self.botColor, self.playerColor)
+            # The bot's move comes from the legal action list, so it does not need to be validated again
+            gameBoard.makeMove(action, self.botColor, self.playerColor)
             self.printMove(self.botColor, action, gameBoard)
             allPotentialMoves = allPotentialMoves + len(allLegalBotActions)
             allMadeMoves = allMadeMoves + 1
@@ -303,7 +1189,60 @@ class Game:
         else:
             print("\nLight and Dark piece players tied!\n")
         
+        self.close()
         allMadeMoves = allMadeMoves * 1.0
         print("Average branching factor: ", allPotentialMoves/allMadeMoves)
+        if (self.algo in (3, 4)):
+            tableStats = self.getTranspositionStats()
+            print("Transposition table hits: ", tableStats['hits'], " misses: ", tableStats['misses'], " hit rate: ", tableStats['hitRate'])
+
+        #print ("Total Static Evaluations: ", self.staticEvaluationCount)
+
+
+# Per-process state of the parallel root search workers
+workerGame = None
+workerSharedAlpha = None
+workerSearchId = None
+
+
+'''
+This function sets up a parallel root search worker process with its own Game and the shared best value.
+'''
+def initRootWorker(gameSettings, sharedAlpha):
+    global workerGame, workerSharedAlpha
+    playerColor, botColor, algo, tableSize, boardSize, useEndgameSolver, endgamePath, batchEvaluation = gameSettings
+    workerGame = Game(playerColor, botColor, algo, 1, tableSize = tableSize, boardSize = boardSize,
+                      useEndgameSolver = useEndgameSolver, endgamePath = endgamePath, batchEvaluation = batchEvaluation)
+    workerSharedAlpha = sharedAlpha
+
+
+'''
+This function searches one root move in a worker process.
+Accepts the search id, the root position and move, depth, the root window, and whether to use alpha beta prunning.
+Returns (value, alpha the move was searched with, nodes searched).
+'''
+def searchRootChild(searchId, gameState, action, depth, rootAlpha, beta, useAlphaBeta):
+    global workerSearchId
+    game = workerGame
+    if (searchId != workerSearchId):
+        # First task of a new bot move: start a new table generation and fresh move ordering
+        workerSearchId = searchId
+        game.tableGeneration = game.tableGeneration + 1
+        game.prepareMoveOrdering(gameState)
+    game.resetSearchStats()
+    game.boundDepth = depth
+    game.searchDepth = depth
+
+    gameState.makeMove(action, game.botColor, game.playerColor)
+    if (not useAlphaBeta):
+        bv, prevAction = game.recurMiniMax(gameState, 1, game.playerColor, game.botColor, False, action)
+        return bv, -MAX_SCORE, game.searchNodes
 
-        #print ("Total Static Evaluations: ", self.staticEvaluationCount)
\ No newline at end of file
+    sharedAlpha = workerSharedAlpha.value
+    alpha = rootAlpha if (sharedAlpha <= rootAlpha) else sharedAlpha - 1
+    bv = -game.recurPrincipalVariation(gameState, 1, game.playerColor, game.botColor, action, -beta, -alpha)[0]
+    if (bv > alpha):
+        with workerSharedAlpha.get_lock():
+            if (bv > workerSharedAlpha.value):
+                workerSharedAlpha.value = bv
+    return bv, alpha, game.searchNodes
@@ -1,162 +1,562 @@
 '''
 GameState object class. GameState object is used to maintain internal representation of the game board.
+
+The board is stored as two integers (bitboards), one for the dark pieces and one for the light pieces.
+Square <row, col> is bit row*boardSize + col, so iterating over set bits from lowest to highest visits the board in
+row-major order. Python integers grow as needed, so the same code runs on every board size from 6x6 to 16x16.
+'''
+
+import random
+
+# Default board size, and the range of supported board sizes
+BOARD_SIZE = 8
+MIN_BOARD_SIZE = 6
+MAX_BOARD_SIZE = 16
+
+
+'''
+Returns the opening removals for a board size: dark removes the piece at the center of the board and light removes
+the piece beside it. On the 8x8 board these are <4,4> and <4,5>.
+'''
+def getOpeningRemovals(boardSize = BOARD_SIZE):
+    center = (boardSize - 1) // 2
+    return ((center, center), None), ((center, center + 1), None)
+
+
+'''
+Converts an action written with lists, such as [[5, 3], [3, 3]], to the tuple form getLegalActions returns.
+'''
+def toAction(coordinates):
+    return tuple(tuple(coordinate) for coordinate in coordinates)
+
+
+'''
+Extends a bitboard of first landing squares into the list of landing squares for chains of 1, 2, 3, ... jumps.
 '''
+def extendChain(chain, step, forwardMasks, opponentPieces, emptySquares):
+    chains = [chain]
+    jumps = 1
+    while (True):
+        # The chain continues if the next square ahead is an opponent and the one after it is empty
+        if (step > 0):
+            chain = chain & forwardMasks[2*jumps] & (opponentPieces >> (2*jumps-1)*step) & (emptySquares >> 2*jumps*step)
+        else:
+            chain = chain & forwardMasks[2*jumps] & (opponentPieces << -(2*jumps-1)*step) & (emptySquares << -2*jumps*step)
+        if (not chain):
+            return chains
+        chains.append(chain)
+        jumps = jumps + 1
+
+
+'''
+This function finds the landing squares of every jump chain in each direction, from the bitboards of the pieces of
+the player to move and of the opponent. Searches that keep only the bitboards, such as random playouts, call it
+directly instead of going through a GameState.
+Returns one list per direction, where entry n is the bitboard of first landing squares that start a chain of n+1 jumps.
+Chains are as long as the board allows.
+'''
+def findJumpChains(tables, curPieces, opponentPieces):
+    boardSize = tables.boardSize
+    emptySquares = tables.fullBoard ^ (curPieces | opponentPieces)
+
+    # A single jump lands on an empty square with an opponent behind it and the jumping piece behind that
+    firstJumps = (emptySquares & (opponentPieces << boardSize) & (curPieces << 2*boardSize),
+                  emptySquares & (opponentPieces >> boardSize) & (curPieces >> 2*boardSize),
+                  emptySquares & (opponentPieces << 1) & (curPieces << 2) & tables.landingRightMask,
+                  emptySquares & (opponentPieces >> 1) & (curPieces >> 2) & tables.landingLeftMask)
+
+    allChains = []
+    for direction in range(len(tables.directions)):
+        if (firstJumps[direction]):
+            step, forwardMasks = tables.directions[direction][2], tables.directions[direction][3]
+            allChains.append(extendChain(firstJumps[direction], step, forwardMasks, opponentPieces, emptySquares))
+        else:
+            allChains.append(())
+    return allChains
+
+
+class BoardTables:
+
+    '''
+    Constructor
+    Builds the masks and lookup tables of one board size. They are built once per board size (see getBoardTables)
+    and shared by every GameState of that size.
+    '''
+    def __init__(self, boardSize):
+        self.boardSize = boardSize
+        self.numOfSquares = boardSize * boardSize
+        self.fullBoard = (1 << self.numOfSquares) - 1
+        self.lineMask = (1 << boardSize) - 1
+
+        # Landing squares of a first jump to the right must be at least two columns from the left edge, and vice versa
+        self.landingRightMask = self.buildStepMask(0, -1, 2)
+        self.landingLeftMask = self.buildStepMask(0, 1, 2)
+
+        # Jump directions in the order getLegalActions has always reported them: a piece jumping down into the empty
+        # square (from above), up (from below), right (from left) and left (from right).
+        # Each entry is (rowStep, colStep, square step, forward masks) where forward masks[n] holds the squares that
+        # can move n steps forward and stay on the board.
+        self.directions = []
+        for rowStep, colStep in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            forwardMasks = [self.buildStepMask(rowStep, colStep, steps) for steps in range(2*boardSize)]
+            self.directions.append((rowStep, colStep, rowStep*boardSize + colStep, forwardMasks))
+        self.squareCoordinates = [divmod(square, boardSize) for square in range(self.numOfSquares)]
+        # Spacing between order keys of consecutive (landing square, direction) pairs, larger than any chain length
+        self.maxChainOrder = boardSize
+        # Bit of each square in the transposed (column-major) bitboards
+        self.transposedBits = [1 << (col*boardSize + row) for row, col in self.squareCoordinates]
+
+        # Zobrist keys: one random 64-bit number per color per square, xor-ed together for every piece on the board.
+        # The generator is seeded so that every process computes the same keys for the same position.
+        zobristRandom = random.Random(325)
+        self.zobristKeys = {color: [zobristRandom.getrandbits(64) for square in range(self.numOfSquares)] for color in ('X', 'O')}
+        self.zobristToMove = {'X': zobristRandom.getrandbits(64), 'O': 0}
+
+        # Move counts of each line contents seen so far, filled in by getLineMoves
+        self.lineMoves = {}
+        self.buildActionTables()
+
+
+    '''
+    Builds the mask of squares that can move the given number of steps along (rowStep, colStep) and stay on the board.
+    Shifting a bitboard by rowStep*boardSize + colStep wraps around the row ends, so shifted bitboards are and-ed with
+    these masks.
+    '''
+    def buildStepMask(self, rowStep, colStep, steps):
+        mask = 0
+        for row in range(self.boardSize):
+            for col in range(self.boardSize):
+                endRow = row + rowStep*steps
+                endCol = col + colStep*steps
+                if (0 <= endRow < self.boardSize and 0 <= endCol < self.boardSize):
+                    mask = mask | (1 << (row*self.boardSize + col))
+        return mask
+
+
+    '''
+    Builds the jump rays and every action of the board.
+    jumpRays[square][direction] holds the (over square, landing square) pairs that a piece on the square passes
+    jumping 1, 2, 3, ... times in the direction, up to the edge of the board.
+    Actions are immutable tuples of (row, col) tuples: the start square followed by each landing square.
+    chainActions[square][direction][n] is the action of the piece on the square jumping n+1 times in the direction,
+    so move generation looks actions up instead of building them.
+    moveEffects maps each action to what makeMove needs: (start square, end square, bitboard of the jumped squares,
+    the same in transposed bits, Zobrist key of the jumped squares per color, rows and columns the move touches).
+    moveFootprints maps each action to the bitboard of every square it starts from, jumps over or lands on, which
+    are the squares its legality depends on.
+    '''
+    def buildActionTables(self):
+        boardSize = self.boardSize
+        self.jumpRays = []
+        self.chainActions = []
+        self.moveEffects = {}
+        self.moveFootprints = {}
+        for square in range(self.numOfSquares):
+            row, col = self.squareCoordinates[square]
+            squareRays = []
+            squareActions = []
+            for rowStep, colStep, step, forwardMasks in self.directions:
+                ray = []
+                jumps = 1
+                while (0 <= row + 2*jumps*rowStep < boardSize and 0 <= col + 2*jumps*colStep < boardSize):
+                    ray.append((square + (2*jumps-1)*step, square + 2*jumps*step))
+                    jumps = jumps + 1
+                squareRays.append(tuple(ray))
+
+                action = (self.squareCoordinates[square],)
+                capturedPieces = 0
+                capturedColumns = 0
+                capturedKeys = {'X': 0, 'O': 0}
+                footprint = 1 << square
+                chainActions = []
+                for overSquare, landingSquare in ray:
+                    action = action + (self.squareCoordinates[landingSquare],)
+                    capturedPieces = capturedPieces | (1 << overSquare)
+                    capturedColumns = capturedColumns | self.transposedBits[overSquare]
+                    capturedKeys = {color: capturedKeys[color] ^ self.zobristKeys[color][overSquare] for color in capturedKeys}
+
+                    # The move runs along one line and crosses every line between its start and end squares
+                    endRow, endCol = self.squareCoordinates[landingSquare]
+                    if (row == endRow):
+                        touchedLines = (row,) + tuple(range(boardSize + min(col, endCol), boardSize + max(col, endCol) + 1))
+                    else:
+                        touchedLines = (boardSize + col,) + tuple(range(min(row, endRow), max(row, endRow) + 1))
+                    self.moveEffects[action] = (square, landingSquare, capturedPieces, capturedColumns, capturedKeys, touchedLines)
+                    footprint = footprint | (1 << overSquare) | (1 << landingSquare)
+                    self.moveFootprints[action] = footprint
+                    chainActions.append(action)
+                squareActions.append(tuple(chainActions))
+            self.jumpRays.append(tuple(squareRays))
+            self.chainActions.append(tuple(squareActions))
+
+
+    '''
+    Counts the moves along one line (a row or a column) of the board.
+    Accepts the dark and light pieces on the line as bit masks. Returns (dark moves, dark extra jumps, light moves,
+    light extra jumps), where a chain of n jumps counts as one move with n-1 extra jumps, the same way
+    getLegalActions lists a double jump and its single jump prefix as two moves.
+    Results are cached in self.lineMoves, since only a few thousand line contents come up in play.
+    '''
+    def getLineMoves(self, darkLine, lightLine):
+        boardSize = self.boardSize
+        lineKey = (darkLine << boardSize) | lightLine
+        lineMoves = self.lineMoves.get(lineKey)
+        if (lineMoves is None):
+            emptyLine = self.lineMask & ~(darkLine | lightLine)
+            counts = []
+            for curLine, opponentLine in ((darkLine, lightLine), (lightLine, darkLine)):
+                numOfMoves = 0
+                extraJumps = 0
+                for start in range(boardSize):
+                    if (not curLine & (1 << start)):
+                        continue
+                    for step in (1, -1):
+                        jumps = 1
+                        while (0 <= start + 2*jumps*step < boardSize and opponentLine & (1 << (start + (2*jumps-1)*step)) \
+                               and emptyLine & (1 << (start + 2*jumps*step))):
+                            numOfMoves = numOfMoves + 1
+                            extraJumps = extraJumps + jumps - 1
+                            jumps = jumps + 1
+                counts.extend((numOfMoves, extraJumps))
+            lineMoves = tuple(counts)
+            self.lineMoves[lineKey] = lineMoves
+        return lineMoves
+
+
+'''
+Returns the shared BoardTables of a board size, building them the first time the size is used.
+'''
+BOARD_TABLES = {}
+def getBoardTables(boardSize = BOARD_SIZE):
+    tables = BOARD_TABLES.get(boardSize)
+    if (tables is None):
+        if (boardSize < MIN_BOARD_SIZE or boardSize > MAX_BOARD_SIZE):
+            raise ValueError('board size must be between ' + str(MIN_BOARD_SIZE) + ' and ' + str(MAX_BOARD_SIZE) +
+                             ', got ' + str(boardSize))
+        tables = BoardTables(boardSize)
+        BOARD_TABLES[boardSize] = tables
+    return tables
+
 
 class GameState:
-    
-    ''' 
+
+    '''
     Constructor
+    Accepts a GameState to copy, or the board size of a new board.
     '''
-    def __init__(self, prevGameState = None):
-        # If no previous game board is provided, then create a new board
+    def __init__(self, prevGameState = None, boardSize = BOARD_SIZE):
+        # If no previous game board is provided, then create a new board with dark pieces on the even squares
         if (prevGameState is None):
-            self.board = [  ['X', 'O', 'X', 'O', 'X', 'O', 'X', 'O'], \
-                            ['O', 'X', 'O', 'X', 'O', 'X', 'O', 'X'], \
-                            ['X', 'O', 'X', 'O', 'X', 'O', 'X', 'O'], \
-                            ['O', 'X', 'O', 'X', 'O', 'X', 'O', 'X'], \
-                            ['X', 'O', 'X', 'O', 'X', 'O', 'X', 'O'], \
-                            ['O', 'X', 'O', 'X', 'O', 'X', 'O', 'X'], \
-                            ['X', 'O', 'X', 'O', 'X', 'O', 'X', 'O'], \
-                            ['O', 'X', 'O', 'X', 'O', 'X', 'O', 'X']]
-        
+            self.boardSize = boardSize
+            self.tables = getBoardTables(boardSize)
+            darkPieces = 0
+            lightPieces = 0
+            for row in range(boardSize):
+                for col in range(boardSize):
+                    if ((row + col) % 2 == 0):
+                        darkPieces = darkPieces | (1 << (row*boardSize + col))
+                    else:
+                        lightPieces = lightPieces | (1 << (row*boardSize + col))
+            self.pieces = {'X': darkPieces, 'O': lightPieces}
+            self.hashKey = self.computeHashKey()
+            self.computeMoveCounts()
+
         # If a previous game board is provided, create a copy of the board
         else:
-            self.board = prevGameState.getBoard()
+            self.boardSize = prevGameState.boardSize
+            self.tables = prevGameState.tables
+            self.pieces = dict(prevGameState.pieces)
+            self.hashKey = prevGameState.hashKey
+            self.columnPieces = dict(prevGameState.columnPieces)
+            self.lineMoves = list(prevGameState.lineMoves)
+            self.mobility = dict(prevGameState.mobility)
+            self.multiJumps = dict(prevGameState.multiJumps)
+
+
+    '''
+    Pickling leaves out the shared tables, which are looked up again by board size when the state is unpickled,
+    so sending a GameState to a worker process stays cheap.
+    '''
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['tables']
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.tables = getBoardTables(self.boardSize)
+
+
+    '''
+    Computes the number of legal moves and extra jumps of each color from scratch.
+    makeMove and unmakeMove keep them up to date by recounting only the rows and columns a move touches.
+    Line n < boardSize is row n, and line boardSize + n is column n, read from the transposed bitboards in
+    self.columnPieces.
+    '''
+    def computeMoveCounts(self):
+        transposedBits = self.tables.transposedBits
+        self.columnPieces = {}
+        for color in ('X', 'O'):
+            columnPieces = 0
+            for square in range(self.tables.numOfSquares):
+                if (self.pieces[color] & (1 << square)):
+                    columnPieces = columnPieces | transposedBits[square]
+            self.columnPieces[color] = columnPieces
+
+        self.lineMoves = [(0, 0, 0, 0)] * (2*self.boardSize)
+        self.mobility = {'X': 0, 'O': 0}
+        self.multiJumps = {'X': 0, 'O': 0}
+        self.refreshLines(range(2*self.boardSize))
+
+
+    '''
+    Recounts the moves along the given lines and updates the move totals.
+    Returns the previous counts of those lines as (line, counts) pairs.
+    '''
+    def refreshLines(self, lines):
+        prevLineMoves = []
+        boardSize = self.boardSize
+        lineMask = self.tables.lineMask
+        lineMovesCache = self.tables.lineMoves
+        darkPieces, lightPieces = self.pieces['X'], self.pieces['O']
+        darkColumns, lightColumns = self.columnPieces['X'], self.columnPieces['O']
+        darkMobility, darkJumps, lightMobility, lightJumps = 0, 0, 0, 0
+        for line in lines:
+            if (line < boardSize):
+                shift = line * boardSize
+                darkLine, lightLine = (darkPieces >> shift) & lineMask, (lightPieces >> shift) & lineMask
+            else:
+                shift = (line - boardSize) * boardSize
+                darkLine, lightLine = (darkColumns >> shift) & lineMask, (lightColumns >> shift) & lineMask
+            newMoves = lineMovesCache.get((darkLine << boardSize) | lightLine)
+            if (newMoves is None):
+                newMoves = self.tables.getLineMoves(darkLine, lightLine)
+            oldMoves = self.lineMoves[line]
+            if (newMoves is not oldMoves):
+                darkMobility = darkMobility + newMoves[0] - oldMoves[0]
+                darkJumps = darkJumps + newMoves[1] - oldMoves[1]
+                lightMobility = lightMobility + newMoves[2] - oldMoves[2]
+                lightJumps = lightJumps + newMoves[3] - oldMoves[3]
+                self.lineMoves[line] = newMoves
+                prevLineMoves.append((line, oldMoves))
+        self.mobility['X'] = self.mobility['X'] + darkMobility
+        self.mobility['O'] = self.mobility['O'] + lightMobility
+        self.multiJumps['X'] = self.multiJumps['X'] + darkJumps
+        self.multiJumps['O'] = self.multiJumps['O'] + lightJumps
+        return prevLineMoves
+
+
+    '''
+    Returns the number of legal moves of the given color, the same as len(getLegalActions(...)).
+    '''
+    def getMobility(self, curColor):
+        return self.mobility[curColor]
+
+
+    '''
+    Returns the total number of jumps beyond the first over all legal moves of the given color.
+    '''
+    def getMultiJumps(self, curColor):
+        return self.multiJumps[curColor]
+
+
+    '''
+    Computes the Zobrist hash of the pieces on the board from scratch.
+    makeMove and unmakeMove keep self.hashKey up to date incrementally.
+    '''
+    def computeHashKey(self):
+        hashKey = 0
+        for color in ('X', 'O'):
+            pieces = self.pieces[color]
+            zobristKeys = self.tables.zobristKeys[color]
+            while (pieces):
+                lowestBit = pieces & -pieces
+                pieces = pieces ^ lowestBit
+                hashKey = hashKey ^ zobristKeys[lowestBit.bit_length() - 1]
+        return hashKey
+
+
+    '''
+    Returns the Zobrist hash of the position with the given player to move.
+    '''
+    def getHashKey(self, curColor):
+        return self.hashKey ^ self.tables.zobristToMove[curColor]
 
 
     '''
     Accessor which returns 2D array of board rather than the memory location of the board
-    '''        
+    '''
     def getBoard(self):
         arrayBoard = []
-        for row in range(8):
+        for row in range(self.boardSize):
             tempRow = []
-            for col in range(8):
-                tempRow.append(self.board[row][col])
+            for col in range(self.boardSize):
+                tempRow.append(self.getPiece(row, col))
             arrayBoard.append(tempRow)
         return arrayBoard
 
 
+    '''
+    Replaces the pieces on the board with the given 2D array (or list of strings) of 'X', 'O' and '.'.
+    This is the inverse of getBoard. The array must be the size of this board.
+    '''
+    def setBoard(self, arrayBoard):
+        if (len(arrayBoard) != self.boardSize or any(len(row) != self.boardSize for row in arrayBoard)):
+            raise ValueError('board must be ' + str(self.boardSize) + 'x' + str(self.boardSize))
+        self.pieces = {'X': 0, 'O': 0}
+        for row in range(self.boardSize):
+            for col in range(self.boardSize):
+                piece = arrayBoard[row][col]
+                if (piece in self.pieces):
+                    self.pieces[piece] = self.pieces[piece] | (1 << (row*self.boardSize + col))
+        self.hashKey = self.computeHashKey()
+        self.computeMoveCounts()
+
+
+    '''
+    Returns the piece at the given coordinate: 'X', 'O', or '.' for an empty square.
+    '''
+    def getPiece(self, row, col):
+        bit = 1 << (row*self.boardSize + col)
+        if (self.pieces['X'] & bit):
+            return 'X'
+        if (self.pieces['O'] & bit):
+            return 'O'
+        return '.'
+
+
+    '''
+    This function finds the landing squares of every jump chain in each direction.
+    Accepts the current and opponent player colors. Returns the chains as findJumpChains does.
+    '''
+    def getJumpChains(self, curColor, opponentColor):
+        return findJumpChains(self.tables, self.pieces[curColor], self.pieces[opponentColor])
+
+
     '''
     This function finds and returns all possible actions for the current player.
     Accepts the current and opponent player colors.
-    Returns a 3D list of tuples including coordinate of start and end location(s).
+    Returns a list of actions, each a tuple of the (row, col) coordinates of the start and end location(s).
     '''
     def getLegalActions(self, curColor, opponentColor):
-        legalActions = []
-        for row in range(8):
-            for col in range(8):
-
-                # Identifies where there are empty spaces
-                if self.board[row][col] == '.':
-
-                    # Check if there is a move into the empty space from above
-                    if (row > 1):
-                        if (self.board[row-1][col] == opponentColor and self.board[row-2][col] == curColor):
-                            if (row < 6):
-                                if (self.board[row+1][col] == opponentColor and self.board[row+2][col] == '.'):
-                                    if (row < 4):
-                                        if (self.board[row+3][col] == opponentColor and self.board[row+4][col] == '.'):
-                                            # action with 3 jumps
-                                            action = [[row-2, col], [row, col], [row+2, col], [row+4, col]]
-                                            legalActions.append(action)
-                                    # action with 2 jumps
-                                    action = [[row-2, col], [row, col], [row+2, col]]
-                                    legalActions.append(action)
-                            # action with 1 jump
-                            action = [[row-2, col], [row, col]]
-                            legalActions.append(action)
-
-                    # Check if there is a move into the empty space from below
-                    if (row < 6):
-                        if (self.board[row+1][col] == opponentColor and self.board[row+2][col] == curColor):
-                            if (row > 1):
-                                if (self.board[row-1][col] == opponentColor and self.board[row-2][col] == '.'):
-                                    if (row > 3):
-                                        if (self.board[row-3][col] == opponentColor and self.board[row-4][col] == '.'):
-                                            action = [[row+2, col], [row, col], [row-2, col], [row-4, col]]
-                                            legalActions.append(action)
-                                    action = [[row+2, col], [row, col], [row-2, col]]
-                                    legalActions.append(action)
-                            action = [[row+2, col], [row, col]]
-                            legalActions.append(action)
-
-                    # Check if there is a move into the empty space from left
-                    if (col > 1):
-                        if (self.board[row][col-1] == opponentColor and self.board[row][col-2] == curColor):
-                            if (col < 6):
-                                if (self.board[row][col+1] == opponentColor and self.board[row][col+2] == '.'):
-                                    if (col < 4):
-                                        if (self.board[row][col+3] == opponentColor and self.board[row][col+4] == '.'):
-                                            action = [[row, col-2], [row, col], [row, col+2], [row, col+4]]
-                                            legalActions.append(action)
-                                    action = [[row, col-2], [row, col], [row, col+2]]
-                                    legalActions.append(action)
-                            action = [[row, col-2], [row, col]]
-                            legalActions.append(action)
-
-                    # Check if there is a move into the empty space from right
-                    if (col < 6):
-                        if (self.board[row][col+1] == opponentColor and self.board[row][col+2] == curColor):
-                            if (col > 1):
-                                if (self.board[row][col-1] == opponentColor and self.board[row][col-2] == '.'):
-                                    if (col > 3):
-                                        if (self.board[row][col-3] == opponentColor and self.board[row][col-4] == '.'):
-                                            action = [[row, col+2], [row, col], [row, col-2], [row, col-4]]
-                                            legalActions.append(action)
-                                    action = [[row, col+2], [row, col], [row, col-2]]
-                                    legalActions.append(action)
-                            action = [[row, col+2], [row, col]]
-                            legalActions.append(action)
-
-        return legalActions
+        # Actions are keyed by first landing square, then direction, then longest chain first
+        tables = self.tables
+        actionsByOrder = {}
+        allChains = self.getJumpChains(curColor, opponentColor)
+        numOfDirections = len(tables.directions)
+
+        for direction in range(numOfDirections):
+            chains = allChains[direction]
+            if (not chains):
+                continue
+            step = tables.directions[direction][2]
+            landingSquares = chains[0]
+            while (landingSquares):
+                lowestBit = landingSquares & -landingSquares
+                landingSquares = landingSquares ^ lowestBit
+                square = lowestBit.bit_length() - 1
+                chainActions = tables.chainActions[square - 2*step][direction]
+                orderKey = (square*numOfDirections + direction) * tables.maxChainOrder
+                actionsByOrder[orderKey] = chainActions[0]
+
+                # Chains that continue past the first landing square
+                numOfJumps = 2
+                while (numOfJumps <= len(chains) and chains[numOfJumps-1] & lowestBit):
+                    actionsByOrder[orderKey - numOfJumps] = chainActions[numOfJumps-1]
+                    numOfJumps = numOfJumps + 1
+
+        # Report actions in row-major order of their first landing square
+        return [actionsByOrder[orderKey] for orderKey in sorted(actionsByOrder)]
 
 
     '''
     This function applys an action to the gameboard
-    Accepts action which should be a 2D list: atleast 2 coordinates of start location and end location(s)
+    Accepts action which should be a 2D list or tuple: atleast 2 coordinates of start location and end location(s)
     Returns the number of jumps, or None if action is not legal
     '''
     def applyAction(self, action, curColor, opponentColor):
 
         # starting moves only provide 1 coordinate, because just remove
         if (action[1] is None):
-            yCoord = action[0][0]
-            xCoord = action[0][1]
-            self.board[yCoord][xCoord] = '.'
+            square = action[0][0]*self.boardSize + action[0][1]
+            for color in ('X', 'O'):
+                if (self.pieces[color] & (1 << square)):
+                    self.pieces[color] = self.pieces[color] ^ (1 << square)
+                    self.columnPieces[color] = self.columnPieces[color] ^ self.tables.transposedBits[square]
+                    self.hashKey = self.hashKey ^ self.tables.zobristKeys[color][square]
+            self.refreshLines((action[0][0], self.boardSize + action[0][1]))
             return 0
 
         # non-starting moves have start coordinate and end coordinate(s)
         else:
+            action = toAction(action)
             allLegalActions = self.getLegalActions(curColor, opponentColor)
             if (action in allLegalActions):
-                numOfJumps = len(action) - 1
-                for jump in range(len(action)-1):
-                    # extract the indices from the action
-                    yCoordStart = action[jump][0]
-                    xCoordStart = action[jump][1]
-                    yCoordEnd = action[jump+1][0]
-                    xCoordEnd = action[jump+1][1]
-                    yCoordMid = (int) ((yCoordStart + yCoordEnd) / 2)
-                    xCoordMid = (int) ((xCoordStart + xCoordEnd) / 2)
-
-                    # make changes to the board to reflect the given action
-                    self.board[yCoordStart][xCoordStart] = '.'
-                    self.board[yCoordEnd][xCoordEnd] = curColor
-                    self.board[yCoordMid][xCoordMid] = '.'                
-                return numOfJumps
+                self.makeMove(action, curColor, opponentColor)
+                return len(action) - 1
             return None
 
 
+    '''
+    This function applys a trusted action to the gameboard in place, without checking that it is legal.
+    Accepts an action taken from getLegalActions and the current and opponent player colors.
+    Returns an undo record that unmakeMove uses to restore the board.
+    '''
+    def makeMove(self, action, curColor, opponentColor):
+        tables = self.tables
+        startSquare, endSquare, capturedPieces, capturedColumns, capturedKeys, touchedLines = tables.moveEffects[action]
+        curPieces = self.pieces[curColor]
+        opponentPieces = self.pieces[opponentColor]
+        curColumns = self.columnPieces[curColor]
+        opponentColumns = self.columnPieces[opponentColor]
+        prevHashKey = self.hashKey
+        prevTotals = (self.mobility['X'], self.mobility['O'], self.multiJumps['X'], self.multiJumps['O'])
+
+        # make changes to the board to reflect the given action
+        transposedBits = tables.transposedBits
+        self.pieces[curColor] = (curPieces ^ (1 << startSquare)) | (1 << endSquare)
+        self.pieces[opponentColor] = opponentPieces & ~capturedPieces
+        self.columnPieces[curColor] = (curColumns ^ transposedBits[startSquare]) | transposedBits[endSquare]
+        self.columnPieces[opponentColor] = opponentColumns & ~capturedColumns
+        curKeys = tables.zobristKeys[curColor]
+        self.hashKey = prevHashKey ^ capturedKeys[opponentColor] ^ curKeys[startSquare] ^ curKeys[endSquare]
+
+        # Recount the line the move runs along and every line crossing it between the start and end squares
+        prevLineMoves = self.refreshLines(touchedLines)
+
+        return (curColor, curPieces, opponentColor, opponentPieces, prevHashKey, curColumns, opponentColumns,
+                prevTotals, prevLineMoves)
+
+
+    '''
+    This function takes back the action that produced the given undo record.
+    Moves must be unmade in the reverse order they were made.
+    '''
+    def unmakeMove(self, undoRecord):
+        curColor, curPieces, opponentColor, opponentPieces, prevHashKey, curColumns, opponentColumns, \
+            prevTotals, prevLineMoves = undoRecord
+        self.pieces[curColor] = curPieces
+        self.pieces[opponentColor] = opponentPieces
+        self.columnPieces[curColor] = curColumns
+        self.columnPieces[opponentColor] = opponentColumns
+        self.hashKey = prevHashKey
+        self.mobility['X'], self.mobility['O'], self.multiJumps['X'], self.multiJumps['O'] = prevTotals
+        for line, lineMoves in prevLineMoves:
+            self.lineMoves[line] = lineMoves
+
+
     '''
     This function provides a string formated version of the gameboard that can be printed
+    Columns are two characters wide on boards larger than 9x9, so that two digit coordinates line up.
     '''
     def getPrintBoard(self):
+        width = len(str(self.boardSize))
         stringBoard = '\n'
-        stringBoard = stringBoard + '  1 2 3 4 5 6 7 8'
-        for row in range(len(self.board)):
-            stringBoard = stringBoard + '\n' + (str)(row+1) + ' '
-            for piece in self.board[row]:
-                stringBoard = stringBoard + piece + ' '
+        stringBoard = stringBoard + ' ' * width + ' ' + ' '.join(str(col+1).rjust(width) for col in range(self.boardSize))
+        for row in range(self.boardSize):
+            stringBoard = stringBoard + '\n' + str(row+1).rjust(width) + ' '
+            for col in range(self.boardSize):
+                stringBoard = stringBoard + self.getPiece(row, col).rjust(width) + ' '
         stringBoard = stringBoard + "\n"
         return stringBoard
@@ -4,6 +4,7 @@ Use this file to drive the program. Make changes to runGame() function in order
 
 from game import Game
 from gameState import GameState
+from openingBook import BOOK_PATH
 
 '''
 This function is used to set up players colors, AI algorithm, and depth.
@@ -14,10 +15,41 @@ def runGame():
     #algo = 1 # AI move selection is random
     #algo = 2 # AI move selection uses minimax + static function evaluation 
     algo = 3 # AI move selection uses minimax with alpha beta pruning + static function evaluation
+    #algo = 4 # AI move selection uses alpha beta pruning, then combinatorial game values of independent regions in the endgame
+    #algo = 5 # AI move selection uses Monte Carlo tree search, playing boundDepth random games per move (e.g. 2000)
 
     '''To select a depth of search for minimax algorithm, change the value of depth variable'''
     boundDepth = 6
 
+    '''To give alpha beta search a time budget per move (in milliseconds) instead of a fixed depth, change the value of timeBudget'''
+    timeBudget = None
+    #timeBudget = 2000
+
+    '''To split the bot's search across several processes, change the value of numWorkers'''
+    numWorkers = 1
+
+    '''To play on a larger or smaller board (6 to 16 squares a side), change the value of boardSize'''
+    boardSize = 8
+
+    '''To let alpha beta search solve endgames exactly, set useEndgameSolver. To keep the solved positions in a file
+    that later games and other processes share, change the value of endgamePath'''
+    useEndgameSolver = True
+    endgamePath = None
+    #endgamePath = 'endgame.db'
+
+    '''To let the bot search its replies while you think about your move, set ponder'''
+    ponder = False
+
+    '''To play the first moves from the opening book built by openingBook.py, set openingBookPath. The book is for the
+    8x8 board, so set it to None on other board sizes'''
+    openingBookPath = BOOK_PATH
+    #openingBookPath = None
+
+    '''To record the search statistics and timings of every bot move, set profilePath. Reports are appended to
+    profilePath + '.jsonl', and a flame graph trace to profilePath + '.folded' '''
+    profilePath = None
+    #profilePath = 'profile'
+
     # Accepts input of 'X' or 'O' to select player color
     validPlayerSelection = False 
     while (validPlayerSelection == False):
@@ -29,10 +61,14 @@ def runGame():
 
     # Creates game and begins game
     if (playerColorInput == 'X'):
-        game = Game('X', 'O', algo, boundDepth)
+        game = Game('X', 'O', algo, boundDepth, timeBudget = timeBudget, numWorkers = numWorkers, boardSize = boardSize,
+                    useEndgameSolver = useEndgameSolver, endgamePath = endgamePath, ponder = ponder,
+                    openingBookPath = openingBookPath, profilePath = profilePath)
         game.run()
     else:
-        game = Game('O', 'X', algo, boundDepth)
+        game = Game('O', 'X', algo, boundDepth, timeBudget = timeBudget, numWorkers = numWorkers, boardSize = boardSize,
+                    useEndgameSolver = useEndgameSolver, endgamePath = endgamePath, ponder = ponder,
+                    openingBookPath = openingBookPath, profilePath = profilePath)
         game.run()
     return game
 
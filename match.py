@@ -0,0 +1,177 @@
+'''
+Headless bot vs bot play. Use this file to play bots against each other without any input or printing, and to
+run batch tournaments whose results are streamed to a JSONL file.
+
+A player is described by a dict: {'algo': 1 to 5, 'depth': search depth, 'timeBudget': milliseconds or None,
+'endgame': whether to use the endgame solver, 'endgamePath': endgame table file or None,
+'openingBookPath': opening book file or None, 'profilePath': path of the search profile files or None}.
+On the command line a player is written as algo:depth or algo:depth:timeBudget, e.g. "3:6" or "3:0:500", and the
+endgame, opening book and profile options apply to both players. For Monte Carlo tree search (algo 5) the depth is the number
+of random games per move, e.g. "5:2000" or "5:0:500".
+
+Example:
+    python match.py --dark 3:4 --light 2:3 --games 1000 --workers 8 --output results.jsonl
+    python match.py --dark 3:0:500 --light 3:4 --board-size 12
+'''
+
+from game import Game
+from gameState import GameState, BOARD_SIZE, getOpeningRemovals
+import argparse
+import concurrent.futures
+import json
+import random
+import time
+
+
+'''
+This function parses a player written as algo:depth or algo:depth:timeBudget.
+Returns the player as a dict.
+'''
+def parsePlayer(playerText):
+    fields = playerText.split(':')
+    if (len(fields) < 1 or len(fields) > 3):
+        raise ValueError('player must be algo:depth or algo:depth:timeBudget, got ' + playerText)
+    algo = int(fields[0])
+    if (algo not in (1, 2, 3, 4, 5)):
+        raise ValueError('algo must be 1, 2, 3, 4 or 5, got ' + fields[0])
+    depth = int(fields[1]) if (len(fields) > 1) else 1
+    timeBudget = int(fields[2]) if (len(fields) > 2) else None
+    if (algo != 1 and depth < 1 and timeBudget is None):
+        raise ValueError('search depth must be at least 1 without a time budget, got ' + playerText)
+    return {'algo': algo, 'depth': depth, 'timeBudget': timeBudget}
+
+
+'''
+This function creates the Game that plays one color of a headless match.
+'''
+def createBot(player, botColor, boardSize = BOARD_SIZE):
+    opponentColor = 'O' if (botColor == 'X') else 'X'
+    return Game(opponentColor, botColor, player['algo'], player['depth'], timeBudget = player.get('timeBudget'),
+                boardSize = boardSize, useEndgameSolver = player.get('endgame', False), endgamePath = player.get('endgamePath'),
+                openingBookPath = player.get('openingBookPath'), profilePath = player.get('profilePath'))
+
+
+'''
+This function plays one game between two bots, with no input or output.
+Accepts the dark and light players, a random seed, a number of opening plies to play at random so that
+deterministic bots do not replay the same game every time, and the board size. Both bots are closed when the
+game ends, so a tournament does not leak their worker pools and open files from game to game.
+Returns a dict with the winner ('X' or 'O'), the number of plies, and the nodes searched and seconds used per color.
+'''
+def playMatch(darkPlayer, lightPlayer, seed = None, openingPlies = 0, boardSize = BOARD_SIZE):
+    rng = random.Random(seed)
+    random.seed(rng.getrandbits(64))
+    bots = {'X': createBot(darkPlayer, 'X', boardSize)}
+    try:
+        bots['O'] = createBot(lightPlayer, 'O', boardSize)
+        nodes = {'X': 0, 'O': 0}
+        seconds = {'X': 0.0, 'O': 0.0}
+
+        gameState = GameState(boardSize = boardSize)
+        darkRemoval, lightRemoval = getOpeningRemovals(boardSize)
+        gameState.applyAction(darkRemoval, 'X', 'O')
+        gameState.applyAction(lightRemoval, 'O', 'X')
+
+        curColor, opponentColor = 'X', 'O'
+        plies = 0
+        while (True):
+            allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+            if (len(allLegalActions) == 0):
+                winner = opponentColor
+                break
+
+            if (plies < openingPlies):
+                action = rng.choice(allLegalActions)
+            else:
+                bot = bots[curColor]
+                start = time.perf_counter()
+                action = bot.selectAction(gameState, allLegalActions)
+                seconds[curColor] = seconds[curColor] + time.perf_counter() - start
+                nodes[curColor] = nodes[curColor] + bot.getSearchStats()['nodes']
+
+            gameState.makeMove(action, curColor, opponentColor)
+            plies = plies + 1
+            curColor, opponentColor = opponentColor, curColor
+    finally:
+        for bot in bots.values():
+            bot.close()
+
+    return {'winner': winner, 'plies': plies, 'nodes': nodes, 'time': seconds}
+
+
+'''
+This function plays one game of a tournament in a worker process and labels its result.
+'''
+def playTournamentGame(gameNumber, darkPlayer, lightPlayer, seed, openingPlies, boardSize):
+    result = playMatch(darkPlayer, lightPlayer, seed, openingPlies, boardSize)
+    result['game'] = gameNumber
+    result['boardSize'] = boardSize
+    result['dark'] = darkPlayer
+    result['light'] = lightPlayer
+    return result
+
+
+'''
+This function plays a batch of games across a pool of processes and appends one JSON line per game to the
+output file as soon as that game finishes.
+Accepts the two players, the number of games, the output path, the number of worker processes, a base seed,
+the number of random opening plies, whether the players swap colors every other game, and the board size.
+Returns the number of wins per player, keyed 'first' (the dark player of game 0) and 'second'.
+'''
+def runTournament(firstPlayer, secondPlayer, numOfGames, outputPath, numWorkers = 1, seed = 0, openingPlies = 2,
+                  swapColors = True, boardSize = BOARD_SIZE):
+    wins = {'first': 0, 'second': 0}
+    with open(outputPath, 'a') as outputFile:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=numWorkers) as pool:
+            futures = {}
+            for gameNumber in range(numOfGames):
+                firstIsDark = not (swapColors and gameNumber % 2 == 1)
+                if (firstIsDark):
+                    darkPlayer, lightPlayer = firstPlayer, secondPlayer
+                else:
+                    darkPlayer, lightPlayer = secondPlayer, firstPlayer
+                future = pool.submit(playTournamentGame, gameNumber, darkPlayer, lightPlayer, seed + gameNumber, openingPlies,
+                                     boardSize)
+                futures[future] = firstIsDark
+
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                firstIsDark = futures[future]
+                if ((result['winner'] == 'X') == firstIsDark):
+                    wins['first'] = wins['first'] + 1
+                else:
+                    wins['second'] = wins['second'] + 1
+                outputFile.write(json.dumps(result) + '\n')
+                outputFile.flush()
+    return wins
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play bot vs bot Konane games without any interaction.')
+    parser.add_argument('--dark', type=parsePlayer, required=True, help='first player, as algo:depth[:timeBudget]')
+    parser.add_argument('--light', type=parsePlayer, required=True, help='second player, as algo:depth[:timeBudget]')
+    parser.add_argument('--games', type=int, default=1, help='number of games to play')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes playing games')
+    parser.add_argument('--output', default='results.jsonl', help='JSONL file that results are appended to')
+    parser.add_argument('--seed', type=int, default=0, help='base random seed')
+    parser.add_argument('--opening-plies', type=int, default=2, help='number of random opening plies per game')
+    parser.add_argument('--no-swap', action='store_true', help='keep the first player on dark for every game')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE, help='squares per side of the board, 6 to 16')
+    parser.add_argument('--endgame', action='store_true', help='let both players solve endgames exactly')
+    parser.add_argument('--endgame-db', help='endgame table file shared by every game and worker')
+    parser.add_argument('--book', help='opening book file both players play their first moves from')
+    parser.add_argument('--profile', help='profile every bot move, appending the first player\'s reports to '
+                                          'PROFILE-first.jsonl and PROFILE-first.folded, and the second player\'s to PROFILE-second.*')
+    args = parser.parse_args()
+    for player, playerName in ((args.dark, 'first'), (args.light, 'second')):
+        player['endgame'] = args.endgame or args.endgame_db is not None
+        player['endgamePath'] = args.endgame_db
+        player['openingBookPath'] = args.book
+        player['profilePath'] = args.profile + '-' + playerName if (args.profile is not None) else None
+
+    start = time.perf_counter()
+    wins = runTournament(args.dark, args.light, args.games, args.output, args.workers, args.seed, args.opening_plies,
+                         not args.no_swap, args.board_size)
+    elapsed = time.perf_counter() - start
+    print('First player wins:', wins['first'], ' Second player wins:', wins['second'])
+    print('Games per second: %.2f' % (args.games / elapsed))
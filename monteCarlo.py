@@ -0,0 +1,292 @@
+'''
+Monte Carlo tree search. Instead of evaluating positions with a static function, the bot plays many random games
+to the end from the current position and grows a tree of the moves that win most often, choosing which move to
+try next with the UCB1 formula (UCT). The bot plays the move that was tried the most.
+
+Random games are played on bare bitboards, the pieces of the player to move and of the opponent, without the
+line counts and hash keys a GameState keeps up to date. The tree is kept from one bot move to the next: after the
+opponent replies, the node of the new position becomes the root, along with every random game already played
+below it.
+
+With more than one worker, each worker process grows its own tree from the same position (root parallelism), and
+the visits of the root moves are added up across the trees.
+'''
+
+from gameState import GameState, BOARD_SIZE, getBoardTables, findJumpChains
+import concurrent.futures
+import math
+import os
+import random
+import time
+
+# Weight of the exploration term of UCB1
+EXPLORATION = 1.4
+
+# Number of iterations between checks of the clock during a timed search
+TIME_CHECK_INTERVAL = 64
+
+
+class MonteCarloNode:
+
+    '''
+    Constructor
+    Accepts the parent node, the action that leads to this node, the color that played it, the hash key of the
+    position after it (with the player to move) and the legal actions of that player.
+    Wins are counted for the color that played the action, so a parent picks the child with the most wins for itself.
+    '''
+    def __init__(self, parent, action, movedColor, hashKey, untriedActions):
+        self.parent = parent
+        self.action = action
+        self.movedColor = movedColor
+        self.hashKey = hashKey
+        self.untriedActions = untriedActions
+        self.children = []
+        self.visits = 0
+        self.wins = 0
+
+
+    '''
+    This function selects the child to search with UCB1: the win rate plus a bonus for children tried less often.
+    '''
+    def selectChild(self):
+        logVisits = EXPLORATION * EXPLORATION * math.log(self.visits)
+        bestChild = None
+        bestScore = -1.0
+        for child in self.children:
+            score = child.wins / child.visits + math.sqrt(logVisits / child.visits)
+            if (score > bestScore):
+                bestChild = child
+                bestScore = score
+        return bestChild
+
+
+'''
+This function plays a random game to the end on bitboards, every move chosen uniformly among the legal moves.
+Accepts the board tables, the pieces of the player to move and of the opponent, their colors and the random
+number generator. Returns the winner's color.
+'''
+def randomPlayout(tables, curPieces, opponentPieces, curColor, opponentColor, rng):
+    chainActions = tables.chainActions
+    moveEffects = tables.moveEffects
+    directions = tables.directions
+    while (True):
+        # Running totals of the moves in each chain, so a move can be picked by its index among all of them
+        allChains = findJumpChains(tables, curPieces, opponentPieces)
+        moveChains = []
+        numOfMoves = 0
+        for direction in range(len(allChains)):
+            for numOfJumps in range(len(allChains[direction])):
+                landingSquares = allChains[direction][numOfJumps]
+                moveChains.append((numOfMoves, direction, numOfJumps, landingSquares))
+                numOfMoves = numOfMoves + bin(landingSquares).count('1')
+        if (numOfMoves == 0):
+            return opponentColor
+
+        # Find the chain of the chosen move, then the square its first jump lands on
+        moveIndex = rng.randrange(numOfMoves)
+        chainNumber = len(moveChains) - 1
+        while (moveChains[chainNumber][0] > moveIndex):
+            chainNumber = chainNumber - 1
+        firstMove, direction, numOfJumps, landingSquares = moveChains[chainNumber]
+        moveIndex = moveIndex - firstMove
+        while (moveIndex):
+            landingSquares = landingSquares & (landingSquares - 1)
+            moveIndex = moveIndex - 1
+        square = (landingSquares & -landingSquares).bit_length() - 1
+
+        action = chainActions[square - 2*directions[direction][2]][direction][numOfJumps]
+        startSquare, endSquare, capturedPieces = moveEffects[action][:3]
+        curPieces, opponentPieces = opponentPieces & ~capturedPieces, (curPieces ^ (1 << startSquare)) | (1 << endSquare)
+        curColor, opponentColor = opponentColor, curColor
+
+
+class MonteCarloTreeSearch:
+
+    '''
+    Constructor
+    Accepts the bot and opponent colors, the board size, the number of worker processes and a random seed.
+    Without a seed, the seed is drawn from the random module, so seeding it makes the search repeatable.
+    '''
+    def __init__(self, botColor, playerColor, boardSize = BOARD_SIZE, numWorkers = 1, seed = None):
+        self.botColor = botColor
+        self.playerColor = playerColor
+        self.boardSize = boardSize
+        self.tables = getBoardTables(boardSize)
+        self.numWorkers = numWorkers
+        self.rng = random.Random(seed if (seed is not None) else random.getrandbits(64))
+        self.root = None
+        self.workerPool = None
+
+        # Statistics of the latest search
+        self.playouts = 0
+        self.reusedVisits = 0
+        self.bestWinRate = 0.0
+
+
+    '''
+    This function finds the tree node of a position with the bot to move: the root itself, or a node two plies
+    below it, after the bot's move and the opponent's reply. The node becomes the new root, and the rest of the
+    tree is dropped. Returns None if the position is not in the tree.
+    '''
+    def findRoot(self, gameState):
+        if (self.root is None):
+            return None
+        hashKey = gameState.getHashKey(self.botColor)
+        if (self.root.hashKey == hashKey):
+            return self.root
+        for child in self.root.children:
+            for grandchild in child.children:
+                if (grandchild.hashKey == hashKey):
+                    grandchild.parent = None
+                    return grandchild
+        return None
+
+
+    '''
+    This function grows the tree by one random game: it walks down the tree by UCB1, adds one new node, plays a
+    random game from it and counts the result in every node on the way back up.
+    Accepts the root position, which is changed during the walk and restored before returning.
+    '''
+    def runIteration(self, gameState):
+        node = self.root
+        curColor, opponentColor = self.botColor, self.playerColor
+        undoRecords = []
+        while (not node.untriedActions and node.children):
+            node = node.selectChild()
+            undoRecords.append(gameState.makeMove(node.action, curColor, opponentColor))
+            curColor, opponentColor = opponentColor, curColor
+
+        if (node.untriedActions):
+            untriedActions = node.untriedActions
+            actionIndex = self.rng.randrange(len(untriedActions))
+            action = untriedActions[actionIndex]
+            untriedActions[actionIndex] = untriedActions[-1]
+            untriedActions.pop()
+            undoRecords.append(gameState.makeMove(action, curColor, opponentColor))
+            child = MonteCarloNode(node, action, curColor, gameState.getHashKey(opponentColor),
+                                   gameState.getLegalActions(opponentColor, curColor))
+            node.children.append(child)
+            node = child
+            curColor, opponentColor = opponentColor, curColor
+
+        winner = randomPlayout(self.tables, gameState.pieces[curColor], gameState.pieces[opponentColor], curColor,
+                               opponentColor, self.rng)
+        while (node is not None):
+            node.visits = node.visits + 1
+            if (node.movedColor == winner):
+                node.wins = node.wins + 1
+            node = node.parent
+
+        while (undoRecords):
+            gameState.unmakeMove(undoRecords.pop())
+
+
+    '''
+    This function grows the tree from a position with the bot to move, reusing the tree of the previous search if
+    the position is in it.
+    Accepts the position, and either a number of iterations or a time budget in milliseconds.
+    Returns a dict of the visits and wins of each root action.
+    '''
+    def search(self, gameState, iterations, timeBudget = None):
+        self.root = self.findRoot(gameState)
+        if (self.root is None):
+            self.root = MonteCarloNode(None, None, self.playerColor, gameState.getHashKey(self.botColor),
+                                       gameState.getLegalActions(self.botColor, self.playerColor))
+        self.reusedVisits = self.root.visits
+
+        # The walk down the tree moves pieces, so it works on a copy of the position
+        searchState = GameState(gameState)
+        deadline = time.perf_counter() + timeBudget/1000.0 if (timeBudget is not None) else None
+        self.playouts = 0
+        while (True):
+            if (deadline is None):
+                if (self.playouts >= iterations):
+                    break
+            elif (self.playouts % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > deadline):
+                break
+            self.runIteration(searchState)
+            self.playouts = self.playouts + 1
+        return {child.action: (child.visits, child.wins) for child in self.root.children}
+
+
+    '''
+    This function returns the process pool of the root parallel search, starting it on first use.
+    Every worker process keeps its own tree for the life of the pool.
+    '''
+    def getWorkerPool(self):
+        if (self.workerPool is None):
+            searchSettings = (self.botColor, self.playerColor, self.boardSize, self.rng.getrandbits(64))
+            self.workerPool = concurrent.futures.ProcessPoolExecutor(max_workers=self.numWorkers, initializer=initSearchWorker,
+                                                                     initargs=(searchSettings,))
+        return self.workerPool
+
+
+    '''
+    This function shuts down the root parallel search workers, if they were started.
+    '''
+    def closeWorkers(self):
+        if (self.workerPool is not None):
+            self.workerPool.shutdown()
+            self.workerPool = None
+
+
+    '''
+    This function selects the bot's move: the root action with the most visits, over every worker's tree.
+    Accepts the position, its legal actions in the bot's move order, and either a number of iterations or a time
+    budget in milliseconds, which each worker spends in full.
+    '''
+    def selectAction(self, gameState, allLegalActions, iterations, timeBudget = None):
+        if (self.numWorkers > 1):
+            pool = self.getWorkerPool()
+            futures = [pool.submit(searchInWorker, gameState, iterations, timeBudget) for worker in range(self.numWorkers)]
+            # A worker that picked up more than one task grew the same tree each time, so only its latest counts
+            # are kept, and the playouts and reused visits are counted from those as well
+            workerStats = {}
+            for future in futures:
+                workerId, childStats, playouts, reusedVisits = future.result()
+                workerStats[workerId] = (childStats, playouts, reusedVisits)
+            rootStats = {}
+            self.playouts = 0
+            self.reusedVisits = 0
+            for childStats, playouts, reusedVisits in workerStats.values():
+                self.playouts = self.playouts + playouts
+                self.reusedVisits = self.reusedVisits + reusedVisits
+                for action, (visits, wins) in childStats.items():
+                    prevVisits, prevWins = rootStats.get(action, (0, 0))
+                    rootStats[action] = (prevVisits + visits, prevWins + wins)
+        else:
+            rootStats = self.search(gameState, iterations, timeBudget)
+
+        # Ties, and moves never tried within a tiny budget, go to the first move in the given order
+        bestAction = allLegalActions[0]
+        bestVisits, bestWins = rootStats.get(bestAction, (0, 0))
+        for action in allLegalActions:
+            visits, wins = rootStats.get(action, (0, 0))
+            if (visits > bestVisits):
+                bestAction, bestVisits, bestWins = action, visits, wins
+        self.bestWinRate = bestWins / bestVisits if (bestVisits > 0) else 0.0
+        return bestAction
+
+
+# Per-process tree search of the root parallel search workers
+workerSearch = None
+
+
+'''
+This function sets up a root parallel search worker process with its own tree search. Every process gets its own
+seed, so that the trees differ.
+'''
+def initSearchWorker(searchSettings):
+    global workerSearch
+    botColor, playerColor, boardSize, seed = searchSettings
+    workerSearch = MonteCarloTreeSearch(botColor, playerColor, boardSize, seed = seed ^ os.getpid())
+
+
+'''
+This function grows a worker's tree from a position.
+Returns (worker process id, visits and wins of each root action, random games played, visits reused from the
+previous search).
+'''
+def searchInWorker(gameState, iterations, timeBudget):
+    childStats = workerSearch.search(gameState, iterations, timeBudget)
+    return os.getpid(), childStats, workerSearch.playouts, workerSearch.reusedVisits
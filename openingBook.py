@@ -0,0 +1,223 @@
+'''
+Opening book. Every game starts from the same position, so the bot's moves in the first few plies can be searched
+once, deeply and offline, and looked up during play instead of searched.
+
+The book is a binary file: a header (magic, version, board size, number of entries, Zobrist fingerprint), then
+entries of (position key, start square, end square, search depth) sorted by key. It is memory-mapped and searched
+by bisection, so opening it reads nothing but the header.
+Positions that are reflections or rotations of each other share one entry. Only the symmetries that keep every
+square's starting color are used, since the others swap the dark and light squares: on even boards these are the
+identity, the 180 degree rotation and the two diagonal reflections.
+
+Example:
+    python openingBook.py --plies 4 --depth 8 --output openingBook.bin
+'''
+
+from gameState import GameState, BOARD_SIZE, getOpeningRemovals, getBoardTables
+import argparse
+import mmap
+import os
+import struct
+import time
+
+# Default book file, next to this file
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openingBook.bin')
+
+BOOK_MAGIC = b'KONABOOK'
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct('<8sIIQQ')
+BOOK_ENTRY = struct.Struct('<QBBH')
+
+# Square maps of the 8 rotations and reflections of the board, as functions of (row, col, last index)
+ALL_SYMMETRIES = (lambda row, col, last: (row, col),
+                  lambda row, col, last: (col, last - row),
+                  lambda row, col, last: (last - row, last - col),
+                  lambda row, col, last: (last - col, row),
+                  lambda row, col, last: (row, last - col),
+                  lambda row, col, last: (last - row, col),
+                  lambda row, col, last: (col, row),
+                  lambda row, col, last: (last - col, last - row))
+
+# Square permutations of the color preserving symmetries, per board size
+BOOK_SYMMETRIES = {}
+
+
+'''
+Returns the color preserving symmetries of a board size, each as a list mapping a square to its image.
+'''
+def getBookSymmetries(boardSize):
+    symmetries = BOOK_SYMMETRIES.get(boardSize)
+    if (symmetries is None):
+        tables = getBoardTables(boardSize)
+        startingDark = GameState(boardSize = boardSize).pieces['X']
+        symmetries = []
+        for symmetry in ALL_SYMMETRIES:
+            permutation = []
+            for row, col in tables.squareCoordinates:
+                imageRow, imageCol = symmetry(row, col, boardSize - 1)
+                permutation.append(imageRow*boardSize + imageCol)
+            keepsColors = all(((startingDark >> square) & 1) == ((startingDark >> permutation[square]) & 1)
+                              for square in range(tables.numOfSquares))
+            if (keepsColors):
+                symmetries.append(permutation)
+        BOOK_SYMMETRIES[boardSize] = symmetries
+    return symmetries
+
+
+'''
+This function finds the book key of a position: the smallest Zobrist hash, with the side to move, over the color
+preserving symmetries of the position.
+Accepts the position and the color to move. Returns (key, permutation of the symmetry that gives the key).
+'''
+def getBookKey(gameState, curColor):
+    tables = gameState.tables
+    bookKey = None
+    bookPermutation = None
+    for permutation in getBookSymmetries(gameState.boardSize):
+        hashKey = tables.zobristToMove[curColor]
+        for color in ('X', 'O'):
+            zobristKeys = tables.zobristKeys[color]
+            pieces = gameState.pieces[color]
+            while (pieces):
+                lowestBit = pieces & -pieces
+                pieces = pieces ^ lowestBit
+                hashKey = hashKey ^ zobristKeys[permutation[lowestBit.bit_length() - 1]]
+        if (bookKey is None or hashKey < bookKey):
+            bookKey = hashKey
+            bookPermutation = permutation
+    return bookKey, bookPermutation
+
+
+class OpeningBook:
+
+    '''
+    Constructor
+    Accepts the path of a book file and the board size it must be for. Raises ValueError if the file is not a book
+    of this version, board size and hashing scheme.
+    '''
+    def __init__(self, path = BOOK_PATH, boardSize = BOARD_SIZE):
+        self.path = path
+        self.boardSize = boardSize
+        self.bookHits = 0
+        self.bookFile = open(path, 'rb')
+        self.entries = mmap.mmap(self.bookFile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        fingerprint = getBoardTables(boardSize).zobristKeys['X'][0]
+        magic, version, bookBoardSize, self.numOfEntries, bookFingerprint = BOOK_HEADER.unpack_from(self.entries, 0)
+        if (magic != BOOK_MAGIC or version != BOOK_VERSION or bookFingerprint != fingerprint):
+            self.close()
+            raise ValueError(str(path) + ' is not an opening book of this version')
+        if (bookBoardSize != boardSize):
+            self.close()
+            raise ValueError(str(path) + ' is an opening book of the ' + str(bookBoardSize) + 'x' + str(bookBoardSize) + ' board')
+        if (len(self.entries) < BOOK_HEADER.size + self.numOfEntries * BOOK_ENTRY.size):
+            self.close()
+            raise ValueError(str(path) + ' is shorter than its header says')
+
+
+    '''
+    This function looks up the book move of a position.
+    Accepts the position, the color to move and its legal actions.
+    Returns (action, depth it was searched to), or None if the position is not in the book.
+    '''
+    def lookup(self, gameState, curColor, allLegalActions):
+        bookKey, permutation = getBookKey(gameState, curColor)
+        low, high = 0, self.numOfEntries
+        while (low < high):
+            middle = (low + high) // 2
+            if (BOOK_ENTRY.unpack_from(self.entries, BOOK_HEADER.size + middle * BOOK_ENTRY.size)[0] < bookKey):
+                low = middle + 1
+            else:
+                high = middle
+        if (low == self.numOfEntries):
+            return None
+        entryKey, startSquare, endSquare, depth = BOOK_ENTRY.unpack_from(self.entries, BOOK_HEADER.size + low * BOOK_ENTRY.size)
+        if (entryKey != bookKey):
+            return None
+
+        # The move is stored as seen in the symmetric position the key came from, so map each legal move the same way
+        boardSize = self.boardSize
+        for action in allLegalActions:
+            actionStart = action[0][0]*boardSize + action[0][1]
+            actionEnd = action[-1][0]*boardSize + action[-1][1]
+            if (permutation[actionStart] == startSquare and permutation[actionEnd] == endSquare):
+                self.bookHits = self.bookHits + 1
+                return action, depth
+        return None
+
+
+    '''
+    This function closes the book file.
+    '''
+    def close(self):
+        if (self.bookFile is not None):
+            self.entries.close()
+            self.bookFile.close()
+            self.bookFile = None
+
+
+'''
+This function builds an opening book by searching every position of the first plies of the game.
+Accepts the output path, the number of plies, the search depth, the board size and the time budget per position
+in milliseconds (None to search to the full depth). Returns the number of positions in the book.
+'''
+def buildOpeningBook(path = BOOK_PATH, plies = 4, depth = 8, boardSize = BOARD_SIZE, timeBudget = None):
+    # game.py imports this file, so Game is imported here rather than at the top
+    from game import Game
+    bots = {'X': Game('O', 'X', 3, depth, timeBudget = timeBudget, boardSize = boardSize),
+            'O': Game('X', 'O', 3, depth, timeBudget = timeBudget, boardSize = boardSize)}
+    gameState = GameState(boardSize = boardSize)
+    darkRemoval, lightRemoval = getOpeningRemovals(boardSize)
+    gameState.applyAction(darkRemoval, 'X', 'O')
+    gameState.applyAction(lightRemoval, 'O', 'X')
+
+    # Positions of each ply, one per book key, starting with dark to move after the removals
+    entries = {}
+    curPositions = [gameState]
+    curColor, opponentColor = 'X', 'O'
+    for ply in range(plies):
+        nextPositions = []
+        for position in curPositions:
+            bookKey, permutation = getBookKey(position, curColor)
+            if (bookKey in entries):
+                continue
+            allLegalActions = position.getLegalActions(curColor, opponentColor)
+            if (len(allLegalActions) == 0):
+                continue
+            bot = bots[curColor]
+            action = bot.selectAction(position, allLegalActions)
+            searchedDepth = bot.completedDepth if (timeBudget is not None) else depth
+            startSquare = action[0][0]*boardSize + action[0][1]
+            endSquare = action[-1][0]*boardSize + action[-1][1]
+            entries[bookKey] = (permutation[startSquare], permutation[endSquare], searchedDepth)
+
+            for action in allLegalActions:
+                nextPosition = GameState(position)
+                nextPosition.makeMove(action, curColor, opponentColor)
+                nextPositions.append(nextPosition)
+        curPositions = nextPositions
+        curColor, opponentColor = opponentColor, curColor
+
+    for bot in bots.values():
+        bot.close()
+    fingerprint = getBoardTables(boardSize).zobristKeys['X'][0]
+    with open(path, 'wb') as bookFile:
+        bookFile.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, boardSize, len(entries), fingerprint))
+        for bookKey in sorted(entries):
+            startSquare, endSquare, searchedDepth = entries[bookKey]
+            bookFile.write(BOOK_ENTRY.pack(bookKey, startSquare, endSquare, searchedDepth))
+    return len(entries)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the opening book by searching the first plies offline.')
+    parser.add_argument('--output', default=BOOK_PATH, help='book file to write')
+    parser.add_argument('--plies', type=int, default=4, help='number of plies from the start covered by the book')
+    parser.add_argument('--depth', type=int, default=8, help='alpha beta search depth of each book position')
+    parser.add_argument('--time-budget', type=int, help='search each position for this many milliseconds instead')
+    parser.add_argument('--board-size', type=int, default=BOARD_SIZE, help='squares per side of the board, 6 to 16')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    numOfEntries = buildOpeningBook(args.output, args.plies, args.depth, args.board_size, args.time_budget)
+    print('Wrote', numOfEntries, 'positions to', args.output, 'in %.1f s' % (time.perf_counter() - start))
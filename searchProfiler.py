@@ -0,0 +1,184 @@
+'''
+Search profiling. A SearchProfiler attached to a Game records, for every bot move:
+- the nodes searched at each ply
+- the static evaluations
+- the cutoffs at each ply, by the place in the move order of the move that caused them
+- the time spent generating moves, evaluating leaves, making and unmaking moves, and copying boards
+- the effective branching factor
+
+Each move's report is appended as one JSON line to <path>.jsonl. The time per ply and per section is appended as
+folded stacks to <path>.folded, the input format of flame graph tools such as flamegraph.pl and speedscope. Stacks
+of the same ply and section add up across moves, so a trace of a whole game or match shows where the time went.
+
+Without a profiler the search only checks that Game.profiler is None, so profiling can be left in for live games.
+Only the search in the main process is profiled, not the parallel root search workers.
+'''
+
+import json
+import time
+
+# Timed sections of the search
+MOVE_GENERATION = 'moveGeneration'
+EVALUATION = 'evaluation'
+MAKE_MOVE = 'makeMove'
+COPY = 'copy'
+SECTIONS = (MOVE_GENERATION, EVALUATION, MAKE_MOVE, COPY)
+
+# Time of the whole subtree below each node, which the flame graph nests the sections in
+SUBTREE = 'subtree'
+
+
+class SearchProfiler:
+
+    '''
+    Constructor
+    Accepts the path the reports are written to, without its extension, or None to keep only the latest report
+    in lastReport.
+    '''
+    def __init__(self, path = None):
+        self.path = path
+        self.moveCount = 0
+        self.lastReport = None
+        self.startMove()
+
+
+    '''
+    This function clears the counters before a bot move is searched.
+    '''
+    def startMove(self):
+        self.moveStart = time.perf_counter()
+        self.nodesByDepth = []
+        self.cutoffsByDepth = []
+        self.sectionTimes = {}
+
+
+    '''
+    This function counts nodes searched at the given ply, one unless a count is given.
+    '''
+    def countNode(self, curDepth, count = 1):
+        nodesByDepth = self.nodesByDepth
+        while (len(nodesByDepth) <= curDepth):
+            nodesByDepth.append(0)
+        nodesByDepth[curDepth] = nodesByDepth[curDepth] + count
+
+
+    '''
+    This function counts a cutoff at the given ply, caused by the move at the given place in the move order.
+    '''
+    def countCutoff(self, curDepth, moveNumber):
+        cutoffsByDepth = self.cutoffsByDepth
+        while (len(cutoffsByDepth) <= curDepth):
+            cutoffsByDepth.append([])
+        cutoffs = cutoffsByDepth[curDepth]
+        while (len(cutoffs) <= moveNumber):
+            cutoffs.append(0)
+        cutoffs[moveNumber] = cutoffs[moveNumber] + 1
+
+
+    '''
+    This function wraps a function so that the time and number of its calls are added to a section at a ply.
+    Time spent in calls that end with an exception, such as a search timeout, is counted too.
+    '''
+    def timed(self, section, curDepth, function):
+        key = (section, curDepth)
+        sectionTimes = self.sectionTimes
+
+        def timedFunction(*args):
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                elapsed = time.perf_counter() - start
+                prevTime, prevCalls = sectionTimes.get(key, (0.0, 0))
+                sectionTimes[key] = (prevTime + elapsed, prevCalls + 1)
+        return timedFunction
+
+
+    '''
+    This function finds the effective branching factor of a search: the branching factor b of a uniform tree of
+    the same depth with as many nodes, so that 1 + b + b**2 + ... + b**depth equals the nodes searched.
+    '''
+    def getEffectiveBranchingFactor(self, nodes, depth):
+        if (depth <= 0 or nodes <= depth + 1):
+            return 1.0
+        low, high = 1.0, float(nodes)
+        for step in range(60):
+            middle = (low + high) / 2
+            treeNodes = sum(middle ** ply for ply in range(depth + 1))
+            if (treeNodes < nodes):
+                low = middle
+            else:
+                high = middle
+        return low
+
+
+    '''
+    This function returns the time of a section at a ply, in seconds.
+    '''
+    def getSectionTime(self, section, curDepth):
+        return self.sectionTimes.get((section, curDepth), (0.0, 0))[0]
+
+
+    '''
+    This function writes the time of each ply and section as folded stacks: one line per stack of frames, from the
+    root ply down, followed by the time spent in its last frame alone, in microseconds.
+    Accepts the move's total time in seconds. Returns the lines.
+    '''
+    def getFoldedStacks(self, moveTime):
+        lines = []
+        maxDepth = max([0, len(self.nodesByDepth) - 1] + [curDepth for section, curDepth in self.sectionTimes])
+        frames = 'ply 0'
+        for curDepth in range(maxDepth + 1):
+            if (curDepth > 0):
+                frames = frames + ';ply ' + str(curDepth)
+            subtreeTime = moveTime if (curDepth == 0) else self.getSectionTime(SUBTREE, curDepth)
+            selfTime = subtreeTime - self.getSectionTime(SUBTREE, curDepth + 1)
+            for section in SECTIONS:
+                sectionTime = self.getSectionTime(section, curDepth)
+                selfTime = selfTime - sectionTime
+                if (sectionTime > 0):
+                    lines.append(frames + ';' + section + ' ' + str(int(sectionTime * 1000000)))
+            lines.append(frames + ' ' + str(max(int(selfTime * 1000000), 0)))
+        return lines
+
+
+    '''
+    This function ends the profile of a bot move. The report is kept in lastReport and, with a path, appended to
+    the JSON lines and folded stack files.
+    Accepts the Game that searched and the move it chose. Returns the report as a dict.
+    '''
+    def endMove(self, game, action):
+        moveTime = time.perf_counter() - self.moveStart
+        self.moveCount = self.moveCount + 1
+        searchStats = game.getSearchStats()
+        treeNodes = sum(self.nodesByDepth)
+        maxDepth = len(self.nodesByDepth) - 1
+        searchedDepth = game.completedDepth if (game.timeBudget is not None) else game.boundDepth
+        branchingByDepth = [self.nodesByDepth[curDepth+1] / self.nodesByDepth[curDepth]
+                            for curDepth in range(maxDepth) if (self.nodesByDepth[curDepth] > 0)]
+
+        sections = {}
+        for section in SECTIONS:
+            sectionTime = sum(times[0] for key, times in self.sectionTimes.items() if (key[0] == section))
+            calls = sum(times[1] for key, times in self.sectionTimes.items() if (key[0] == section))
+            sections[section] = {'time': sectionTime, 'calls': calls}
+
+        self.lastReport = {'move': self.moveCount, 'color': game.botColor, 'algo': game.algo,
+                           'action': [list(coordinate) for coordinate in action] if (action is not None) else None,
+                           'time': moveTime, 'depth': searchedDepth, 'maxPly': maxDepth,
+                           'nodes': searchStats['nodes'], 'nodesByDepth': self.nodesByDepth,
+                           'evaluations': searchStats['evaluations'], 'solvedNodes': searchStats['solvedNodes'],
+                           'cutoffs': searchStats['cutoffs'], 'firstMoveCutoffRate': searchStats['firstMoveCutoffRate'],
+                           'cutoffsByMoveNumber': self.cutoffsByDepth,
+                           'nullWindowResearches': searchStats['nullWindowResearches'],
+                           'aspirationResearches': searchStats['aspirationResearches'],
+                           'sections': sections,
+                           'effectiveBranchingFactor': self.getEffectiveBranchingFactor(treeNodes, searchedDepth),
+                           'branchingByDepth': branchingByDepth}
+
+        if (self.path is not None):
+            with open(self.path + '.jsonl', 'a') as reportFile:
+                reportFile.write(json.dumps(self.lastReport) + '\n')
+            with open(self.path + '.folded', 'a') as traceFile:
+                traceFile.write(''.join(line + '\n' for line in self.getFoldedStacks(moveTime)))
+        return self.lastReport
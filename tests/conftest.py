@@ -0,0 +1,35 @@
+'''
+Shared helpers of the tests. The repository root is put on the import path, so the tests run from any directory.
+'''
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gameState import GameState, getOpeningRemovals
+
+
+'''
+This function plays seeded random games from the standard opening and collects every position reached.
+Accepts the number of games, the seed and the board size. Returns a list of (gameState, last action, color to move).
+'''
+def randomGamePositions(numOfGames, seed, boardSize = 8):
+    rng = random.Random(seed)
+    positions = []
+    for gameNumber in range(numOfGames):
+        gameState = GameState(boardSize = boardSize)
+        darkRemoval, lightRemoval = getOpeningRemovals(boardSize)
+        gameState.applyAction(darkRemoval, 'X', 'O')
+        gameState.applyAction(lightRemoval, 'O', 'X')
+        curColor, opponentColor = 'X', 'O'
+        while (True):
+            allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+            if (len(allLegalActions) == 0):
+                break
+            action = rng.choice(allLegalActions)
+            gameState.makeMove(action, curColor, opponentColor)
+            curColor, opponentColor = opponentColor, curColor
+            positions.append((GameState(gameState), action, curColor))
+    return positions
@@ -0,0 +1,47 @@
+'''
+Checks that the batched NumPy evaluation of frontier leaves gives exactly the scores of the scalar evaluation.
+'''
+
+from conftest import randomGamePositions
+from game import Game
+import pytest
+
+pytest.importorskip('numpy')
+
+from batchEvaluation import countMovesBatch
+
+
+@pytest.mark.parametrize('boardSize', [6, 8, 12])
+def test_batch_move_counts_match_game_state(boardSize):
+    positions = randomGamePositions(3, seed=boardSize, boardSize=boardSize)
+    mobility, multiJumps = countMovesBatch([gameState.pieces['X'] for gameState, prevAction, curColor in positions],
+                                           [gameState.pieces['O'] for gameState, prevAction, curColor in positions], boardSize)
+    for index, (gameState, prevAction, curColor) in enumerate(positions):
+        for color in ('X', 'O'):
+            assert mobility[color][index] == gameState.mobility[color]
+            assert multiJumps[color][index] == gameState.multiJumps[color]
+
+
+@pytest.mark.parametrize('botColor', ['X', 'O'])
+def test_frontier_scores_match_scalar_evaluation(botColor):
+    playerColor = 'O' if (botColor == 'X') else 'X'
+    game = Game(playerColor, botColor, 3, 2, batchEvaluation = True)
+    for gameState, prevAction, curColor in randomGamePositions(4, seed=7):
+        opponentColor = 'O' if (curColor == 'X') else 'X'
+        allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+        scalarScores = []
+        for action in allLegalActions:
+            undoRecord = gameState.makeMove(action, curColor, opponentColor)
+            scalarScores.append(game.evaluation(gameState, action))
+            gameState.unmakeMove(undoRecord)
+        assert game.evaluateFrontier(gameState, curColor, opponentColor, allLegalActions) == scalarScores
+
+
+def test_batch_search_matches_scalar_search():
+    for gameState, prevAction, curColor in randomGamePositions(2, seed=3)[::5]:
+        opponentColor = 'O' if (curColor == 'X') else 'X'
+        allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+        # Batch evaluation counts every frontier child as a node, even ones a cutoff skips, so only moves are compared
+        actions = [Game(opponentColor, curColor, 3, 3, batchEvaluation = batchEvaluation).selectAction(gameState, allLegalActions)
+                   for batchEvaluation in (False, True)]
+        assert actions[0] == actions[1]
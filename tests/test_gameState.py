@@ -0,0 +1,60 @@
+'''
+Checks the bitboard move generator of GameState against a plain list-based generator over seeded random games.
+'''
+
+from conftest import randomGamePositions
+import pytest
+
+
+'''
+This function finds the legal actions of a color by walking the 2D board: from every piece, jump in each
+direction for as long as an opponent piece is followed by an empty square. Every prefix of a chain is a move.
+'''
+def getListLegalActions(board, curColor, opponentColor):
+    boardSize = len(board)
+    legalActions = []
+    for row in range(boardSize):
+        for col in range(boardSize):
+            if (board[row][col] != curColor):
+                continue
+            for rowStep, colStep in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                action = [(row, col)]
+                curRow, curCol = row, col
+                while (0 <= curRow + 2*rowStep < boardSize and 0 <= curCol + 2*colStep < boardSize):
+                    if (board[curRow + rowStep][curCol + colStep] != opponentColor or board[curRow + 2*rowStep][curCol + 2*colStep] != '.'):
+                        break
+                    curRow, curCol = curRow + 2*rowStep, curCol + 2*colStep
+                    action.append((curRow, curCol))
+                    legalActions.append(tuple(action))
+    return legalActions
+
+
+@pytest.mark.parametrize('boardSize', [6, 8, 10, 16])
+def test_legal_actions_match_list_generator(boardSize):
+    for gameState, prevAction, curColor in randomGamePositions(3, seed=boardSize, boardSize=boardSize):
+        board = gameState.getBoard()
+        for color, opponentColor in (('X', 'O'), ('O', 'X')):
+            legalActions = gameState.getLegalActions(color, opponentColor)
+            assert len(set(legalActions)) == len(legalActions)
+            assert sorted(legalActions) == sorted(getListLegalActions(board, color, opponentColor))
+            assert gameState.mobility[color] == len(legalActions)
+
+
+def test_make_and_unmake_move_match_board_edit():
+    for gameState, prevAction, curColor in randomGamePositions(3, seed=1):
+        opponentColor = 'O' if (curColor == 'X') else 'X'
+        board = gameState.getBoard()
+        hashKey = gameState.getHashKey(curColor)
+        for action in gameState.getLegalActions(curColor, opponentColor):
+            expected = [list(row) for row in board]
+            expected[action[0][0]][action[0][1]] = '.'
+            for jump in range(len(action) - 1):
+                expected[(action[jump][0] + action[jump+1][0]) // 2][(action[jump][1] + action[jump+1][1]) // 2] = '.'
+            expected[action[-1][0]][action[-1][1]] = curColor
+
+            undoRecord = gameState.makeMove(action, curColor, opponentColor)
+            assert gameState.getBoard() == expected
+            assert gameState.hashKey == gameState.computeHashKey()
+            gameState.unmakeMove(undoRecord)
+            assert gameState.getBoard() == board
+            assert gameState.getHashKey(curColor) == hashKey
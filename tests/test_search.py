@@ -0,0 +1,61 @@
+'''
+Checks that the principal variation search, with its null windows, aspiration windows and transposition table,
+finds the same best score as a plain negamax search of the whole tree, and plays a move that reaches it.
+'''
+
+from conftest import randomGamePositions
+from game import Game, MAX_SCORE, WIN_SCORE, WIN_THRESHOLD
+from gameState import GameState
+import pytest
+
+
+'''
+This function is the reference search: negamax without pruning, with the scores recurPrincipalVariation gives.
+Leaves are scored by the static evaluation for the player to move, and a player without moves has lost.
+Accepts the Game that evaluates, the position, the ply, the colors and the move that reached the position.
+Returns the score for the player to move.
+'''
+def negamax(game, gameState, curDepth, curColor, opponentColor, prevAction):
+    if (curDepth == game.boundDepth):
+        botScore = game.evaluation(gameState, prevAction)
+        return botScore if (curColor == game.botColor) else -botScore
+    allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+    if (len(allLegalActions) == 0):
+        return -(WIN_SCORE - curDepth)
+    bestScore = None
+    for action in allLegalActions:
+        undoRecord = gameState.makeMove(action, curColor, opponentColor)
+        score = -negamax(game, gameState, curDepth+1, opponentColor, curColor, action)
+        gameState.unmakeMove(undoRecord)
+        if (bestScore is None or score > bestScore):
+            bestScore = score
+    return bestScore
+
+
+@pytest.mark.parametrize('depth', [2, 3])
+def test_principal_variation_search_matches_negamax(depth):
+    for gameState, prevAction, curColor in randomGamePositions(3, seed=depth)[::3]:
+        opponentColor = 'O' if (curColor == 'X') else 'X'
+        allLegalActions = gameState.getLegalActions(curColor, opponentColor)
+        if (len(allLegalActions) == 0):
+            continue
+        game = Game(opponentColor, curColor, 3, depth)
+        moveScores = {}
+        for action in allLegalActions:
+            undoRecord = gameState.makeMove(action, curColor, opponentColor)
+            moveScores[action] = -negamax(game, gameState, 1, opponentColor, curColor, action)
+            gameState.unmakeMove(undoRecord)
+        bestScore = max(moveScores.values())
+
+        action = game.selectMiniMaxAB(GameState(gameState), allLegalActions, -MAX_SCORE, MAX_SCORE, depthLimit = depth)
+        assert game.principalScore == bestScore
+        assert moveScores[action] == bestScore
+
+
+def test_blocked_leaf_is_not_a_win():
+    # A leaf where the human has no moves is scored by evaluation, so only a search that reaches a player without
+    # moves may report a win
+    for gameState, prevAction, curColor in randomGamePositions(6, seed=5):
+        opponentColor = 'O' if (curColor == 'X') else 'X'
+        game = Game(curColor, opponentColor, 3, 2)
+        assert abs(game.evaluation(gameState, prevAction)) < WIN_THRESHOLD